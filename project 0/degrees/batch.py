@@ -0,0 +1,148 @@
+"""
+Answers many degrees queries at once.
+
+Reads one "source<TAB>target" pair per line, each being a person id or an
+unambiguous name, and writes one JSON object per pair to stdout. Pairs are
+grouped by source so a single breadth-first search answers all targets of
+a source, and groups can be spread over a pool of worker processes.
+
+Unknown names are answered with an error and, with --fuzzy, the closest
+candidate names.
+
+Usage: python batch.py [directory] [pairs] [--workers N] [--compact] [--no-cache] [--fuzzy]
+       [--lean]
+"""
+
+import argparse
+import json
+import multiprocessing
+import sys
+
+import degrees
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("pairs", nargs="?", type=argparse.FileType("r", encoding="utf-8"),
+                        default=sys.stdin)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of worker processes")
+    parser.add_argument("--compact", action="store_true",
+                        help="store the graph in integer CSR arrays")
+    parser.add_argument("--no-cache", dest="cache", action="store_false",
+                        help="always parse the CSV files, ignoring snapshots")
+    parser.add_argument("--fuzzy", action="store_true",
+                        help="suggest similar names for unknown people")
+    parser.add_argument("--lean", action="store_true",
+                        help="keep only the graph and names in memory")
+    args = parser.parse_args()
+
+    settings = (args.directory, args.compact, args.cache, args.lean)
+    load(*settings)
+    if args.fuzzy:
+        degrees.load_name_index()
+    for answer in answer_pairs(read_pairs(args.pairs), args.workers, settings):
+        print(json.dumps(answer), flush=True)
+
+
+def load(directory, compact, cache, lean):
+    """
+    Loads the dataset, once per process: workers forked from a process
+    that already loaded it share its memory instead of reloading it.
+    """
+    if degrees.people or degrees.graph is not None:
+        return
+    degrees.load_data(directory, compact=compact, cache=cache, lean=lean)
+
+
+def read_pairs(lines):
+    """Yields (source, target) from tab-separated lines, skipping blank ones."""
+    for line in lines:
+        line = line.rstrip("\n")
+        if line.strip():
+            source, _, target = line.partition("\t")
+            yield source.strip(), target.strip()
+
+
+def resolve(person):
+    """
+    Returns (person_id, None) for a person id or unambiguous name,
+    or (None, error) otherwise.
+    """
+    if degrees.is_person(person):
+        return person, None
+    person_ids = degrees.names.get(person.lower(), set())
+    if len(person_ids) == 1:
+        return next(iter(person_ids)), None
+    elif person_ids:
+        return None, f"ambiguous name '{person}'"
+    return None, f"person '{person}' not found"
+
+
+def error_answer(source, target, error):
+    """
+    Returns the answer for a pair that can't be resolved, listing
+    (name, score) candidates for unknown names if a name index is loaded.
+    """
+    answer = {"source": source, "target": target, "error": error}
+    if degrees.name_index is not None:
+        for key, person in (("source_candidates", source), ("target_candidates", target)):
+            if not degrees.is_person(person) and person.lower() not in degrees.names:
+                answer[key] = degrees.name_index.lookup(person)
+    return answer
+
+
+def answer_pairs(pairs, workers=1, settings=None):
+    """
+    Yields one answer dictionary per (source, target) pair. Answers for
+    unresolvable people come first, the rest as each source is finished.
+
+    With more than one worker, `settings` are the `load` arguments
+    each worker process uses to load the dataset.
+    """
+    # Maps source_id to {target_id: [pairs asking for it]}
+    groups = {}
+    for source, target in pairs:
+        source_id, error = resolve(source)
+        if error is None:
+            target_id, error = resolve(target)
+        if error is not None:
+            yield error_answer(source, target, error)
+            continue
+        targets = groups.setdefault(source_id, {})
+        targets.setdefault(target_id, []).append((source, target))
+
+    tasks = [(source_id, list(targets)) for source_id, targets in groups.items()]
+    if workers > 1:
+        with multiprocessing.Pool(workers, initializer=load, initargs=settings) as pool:
+            for source_id, paths in pool.imap_unordered(search, tasks):
+                yield from answers(source_id, paths, groups[source_id])
+    else:
+        for source_id, paths in map(search, tasks):
+            yield from answers(source_id, paths, groups[source_id])
+
+
+def search(task):
+    """Runs one multi-target search for a (source_id, target_ids) task."""
+    source_id, target_ids = task
+    return source_id, degrees.shortest_paths(source_id, target_ids)
+
+
+def answers(source_id, paths, targets):
+    """Yields the answer dictionaries of every pair asking from `source_id`."""
+    for target_id, asked in targets.items():
+        path = paths[target_id]
+        for source, target in asked:
+            yield {
+                "source": source,
+                "target": target,
+                "source_id": source_id,
+                "target_id": target_id,
+                "degrees": None if path is None else len(path),
+                "path": path
+            }
+
+
+if __name__ == "__main__":
+    main()
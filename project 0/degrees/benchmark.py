@@ -0,0 +1,201 @@
+"""
+Compares the search algorithms, graph representations, loading modes and
+name lookups of degrees.py on random pairs of people.
+
+Usage: python benchmark.py [directory] [pairs] [seed]
+"""
+
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import degrees
+from landmarks import LandmarkIndex
+from nameindex import NameIndex
+
+LANDMARKS = 32
+
+
+def benchmark_searches(pairs):
+    """
+    Runs every search in `degrees.SEARCHES` over the same (source, target)
+    pairs and returns a dictionary of: name, total expanded people and
+    total seconds, checking that all searches agree on path lengths.
+    """
+    results = {}
+    lengths = {}
+    for name, search in degrees.SEARCHES.items():
+        stats = {"expanded": 0}
+        start = time.perf_counter()
+        lengths[name] = []
+        for source, target in pairs:
+            path = search(source, target, stats=stats)
+            lengths[name].append(None if path is None else len(path))
+        results[name] = {
+            "expanded": stats["expanded"],
+            "seconds": time.perf_counter() - start
+        }
+
+    expected = lengths["bfs"]
+    for name in lengths:
+        if lengths[name] != expected:
+            raise AssertionError(f"{name} disagrees with bfs on path lengths")
+    return results
+
+
+def benchmark_representations(directory, pairs):
+    """
+    Loads `directory` once with the dictionary representation and once
+    with the compact CSR graph, returning for each the bytes allocated by
+    `load_data` and the total seconds BFS takes over `pairs`.
+    """
+    results = {}
+    for name, compact in (("dict", False), ("compact", True)):
+        reset_data()
+        tracemalloc.start()
+        degrees.load_data(directory, compact=compact)
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        for source, target in pairs:
+            degrees.shortest_path(source, target)
+        results[name] = {
+            "memory": memory,
+            "seconds": time.perf_counter() - start
+        }
+    return results
+
+
+def benchmark_name_lookups(count, rng):
+    """
+    Looks up `count` random names with one character dropped, returning the
+    seconds taken to build the name index, the per-lookup latencies in
+    seconds and the fraction of lookups listing the intended name.
+    """
+    start = time.perf_counter()
+    index = NameIndex(degrees.names)
+    build = time.perf_counter() - start
+
+    names = sorted(degrees.names)
+    latencies = []
+    found = 0
+    for _ in range(count):
+        name = rng.choice(names)
+        i = rng.randrange(len(name))
+        start = time.perf_counter()
+        candidates = index.lookup(name[:i] + name[i + 1:])
+        latencies.append(time.perf_counter() - start)
+        found += any(candidate == name for candidate, _ in candidates)
+    return build, latencies, found / count
+
+
+def benchmark_peak_memory(directory):
+    """
+    Loads `directory` in a fresh process per loading mode, returning
+    for each mode the peak resident set size in KiB before and after.
+    """
+    results = {}
+    for mode in ("dict", "compact", "lean"):
+        code = f"import benchmark; benchmark.print_peak_memory({directory!r}, {mode!r})"
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.split()
+        results[mode] = {"before": int(output[0]), "after": int(output[1])}
+    return results
+
+
+def print_peak_memory(directory, mode):
+    """Prints the peak RSS in KiB before and after loading in `mode`."""
+    before = peak_memory()
+    degrees.load_data(directory, compact=mode == "compact", lean=mode == "lean")
+    print(before, peak_memory())
+
+
+def peak_memory():
+    """
+    Returns the peak resident set size of this process in KiB, from
+    /proc where available since ru_maxrss survives exec on Linux.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def reset_data():
+    """Forgets any data loaded by `degrees.load_data`."""
+    degrees.names.clear()
+    degrees.people.clear()
+    degrees.movies.clear()
+    degrees.graph = None
+    degrees.landmarks = None
+    degrees.person_rows = None
+    degrees.movie_rows = None
+
+
+def random_pairs(count, rng):
+    """
+    Returns `count` random (source, target) pairs of person ids,
+    picked by name as an interactive user would.
+    """
+    names = sorted(degrees.names)
+    pairs = []
+    for _ in range(count):
+        source = sorted(degrees.names[rng.choice(names)])[0]
+        target = sorted(degrees.names[rng.choice(names)])[0]
+        pairs.append((source, target))
+    return pairs
+
+
+def main():
+    if len(sys.argv) > 4:
+        sys.exit("Usage: python benchmark.py [directory] [pairs] [seed]")
+    directory = sys.argv[1] if len(sys.argv) > 1 else "large"
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+
+    start = time.perf_counter()
+    degrees.load_data(directory)
+    print(f"Data loaded in {time.perf_counter() - start:.2f}s.")
+
+    start = time.perf_counter()
+    degrees.landmarks = LandmarkIndex.build(degrees.compact_graph(), LANDMARKS)
+    print(f"{LANDMARKS} landmarks built in {time.perf_counter() - start:.2f}s, "
+          f"{degrees.landmarks.memory_size() / 2 ** 20:.1f} MiB.")
+
+    pairs = random_pairs(count, random.Random(seed))
+    results = benchmark_searches(pairs)
+    for name, result in results.items():
+        print(f"{name:>14}: {result['expanded']:>10} expanded, "
+              f"{result['seconds']:.3f}s for {count} pairs")
+
+    build, latencies, found = benchmark_name_lookups(count, random.Random(seed))
+    latencies.sort()
+    print(f"Name index built in {build:.2f}s, lookups take "
+          f"{latencies[len(latencies) // 2] * 1000:.2f}ms median, "
+          f"{latencies[-1] * 1000:.2f}ms max, {found:.0%} found.")
+
+    results = benchmark_representations(directory, pairs)
+    for name, result in results.items():
+        print(f"{name:>14}: {result['memory'] / 2 ** 20:>8.1f} MiB, "
+              f"{result['seconds']:.3f}s for {count} pairs")
+
+    results = benchmark_peak_memory(os.path.abspath(directory))
+    for name, result in results.items():
+        print(f"{name:>14}: peak RSS {result['before'] / 1024:.1f} MiB before loading, "
+              f"{result['after'] / 1024:.1f} MiB after")
+
+
+if __name__ == "__main__":
+    main()
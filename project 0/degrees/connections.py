@@ -0,0 +1,112 @@
+"""
+Enumerating many connections between two people instead of one.
+
+Both generators take a `neighbors` function returning the (movie_id,
+person_id) pairs of a person, like `degrees.neighbors_for_person`, run a
+single breadth-first search and then yield (movie_id, person_id) paths
+lazily, so a caller can stop after as many paths as it needs.
+"""
+
+import heapq
+from collections import deque
+from itertools import count
+
+
+def all_shortest_paths(source, target, neighbors):
+    """
+    Yields every shortest path from `source` to `target`.
+
+    The search keeps, for every person up to the target's layer, all the
+    (movie_id, person_id) pairs one layer closer to the source that reach
+    them. Paths are then read off that layered graph depth first from the
+    target, so memory stays proportional to the graph, not to the paths.
+    """
+    if source == target:
+        yield []
+        return
+
+    # Maps each reached person to its layer and its predecessors
+    layers = {source: 0}
+    predecessors = {source: []}
+    layer = [source]
+    depth = 0
+    while layer and target not in layers:
+        depth += 1
+        next_layer = []
+        for person_id in layer:
+            for movie_id, neighbor_id in neighbors(person_id):
+                if neighbor_id not in layers:
+                    layers[neighbor_id] = depth
+                    predecessors[neighbor_id] = []
+                    next_layer.append(neighbor_id)
+                if layers[neighbor_id] == depth:
+                    predecessors[neighbor_id].append((movie_id, person_id))
+        layer = next_layer
+
+    if target not in layers:
+        return
+
+    # Each stack entry is a person and how many of its predecessors are tried
+    path = []
+    stack = [[target, 0]]
+    while stack:
+        person_id, tried = stack[-1]
+        if person_id == source:
+            yield list(reversed(path))
+            stack.pop()
+            if path:
+                path.pop()
+            continue
+        if tried == len(predecessors[person_id]):
+            stack.pop()
+            if path:
+                path.pop()
+            continue
+        stack[-1][1] += 1
+        movie_id, parent_id = predecessors[person_id][tried]
+        path.append((movie_id, person_id))
+        stack.append([parent_id, 0])
+
+
+def shortest_paths_in_order(source, target, neighbors):
+    """
+    Yields the simple paths (no person twice) from `source` to `target`
+    shortest first, so the first k are the k shortest paths.
+
+    One breadth-first search from the target gives the exact distance of
+    every person to it. Partial paths are then extended best first by
+    length so far plus that distance, which never overestimates, so
+    complete paths come out in order of length.
+    """
+    distances = {target: 0}
+    frontier = deque([target])
+    while frontier:
+        person_id = frontier.popleft()
+        for _, neighbor_id in neighbors(person_id):
+            if neighbor_id not in distances:
+                distances[neighbor_id] = distances[person_id] + 1
+                frontier.append(neighbor_id)
+    if source not in distances:
+        return
+
+    # Partial paths are (person_id, parent entry, movie_id, people on it)
+    tie = count()
+    queue = [(distances[source], next(tie), (source, None, None, frozenset([source])))]
+    while queue:
+        _, _, entry = heapq.heappop(queue)
+        person_id, parent, movie_id, visited = entry
+        if person_id == target:
+            solution = []
+            while entry[1] is not None:
+                solution.append((entry[2], entry[0]))
+                entry = entry[1]
+            solution.reverse()
+            yield solution
+            continue
+
+        length = len(visited)
+        for movie_id, neighbor_id in neighbors(person_id):
+            if neighbor_id in visited or neighbor_id not in distances:
+                continue
+            child = (neighbor_id, entry, movie_id, visited | {neighbor_id})
+            heapq.heappush(queue, (length + distances[neighbor_id], next(tie), child))
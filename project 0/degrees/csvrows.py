@@ -0,0 +1,52 @@
+"""
+Streaming access to the rows of a CSV file that remembers where every row
+starts, so single rows can be read back later instead of kept in memory.
+
+Rows are assumed to fit on one line, as in the degrees datasets.
+"""
+
+import csv
+from array import array
+
+
+class CsvRows():
+
+    def __init__(self, path):
+        self.path = path
+        self.fields = None
+        self.offsets = array("q")
+        self.file = None
+
+    def __iter__(self):
+        """
+        Streams the file once, yielding each row as a dictionary
+        and recording its byte offset.
+        """
+        self.offsets = array("q")
+        with open(self.path, "rb") as f:
+            header = f.readline()
+            self.fields = next(csv.reader([header.decode("utf-8-sig")]))
+            position = len(header)
+            for line in f:
+                start = position
+                position += len(line)
+                if not line.strip():
+                    continue
+                self.offsets.append(start)
+                yield dict(zip(self.fields, next(csv.reader([line.decode("utf-8")]))))
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def get(self, position):
+        """Reads back the dictionary of the row at `position` in file order."""
+        if self.file is None:
+            self.file = open(self.path, "rb")
+        self.file.seek(self.offsets[position])
+        line = self.file.readline().decode("utf-8")
+        return dict(zip(self.fields, next(csv.reader([line]))))
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
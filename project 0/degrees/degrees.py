@@ -1,31 +1,160 @@
+import argparse
 import csv
+import itertools
+import math
 import sys
+from collections import deque
 
+import connections
+from csvrows import CsvRows
+from graph import CompactGraph, label_components
+from landmarks import LandmarkIndex
+from nameindex import NameIndex
+from snapshot import read_snapshot, write_snapshot
 from util import Node, StackFrontier, QueueFrontier
 
 # Maps names to a set of corresponding person_ids
 names = {}
 
-# Maps person_ids to a dictionary of: name, birth, movies (a set of movie_ids)
+# Maps person_ids to a dictionary of: name, birth, movies (a set of movie_ids),
+# component (the label of the person's connected component)
 people = {}
 
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Integer-indexed CSR graph, replacing the movies/stars sets above
+# when data is loaded with compact, cache or lean
+graph = None
 
-def load_data(directory):
+# CSV rows of people and movies, read back on demand instead of kept in
+# the dictionaries above when data is loaded with lean=True
+person_rows = None
+movie_rows = None
+
+# Maps component labels to the number of people in the component
+component_sizes = []
+
+# Landmark distance index, only built when asked for by `load_landmarks`
+landmarks = None
+
+# Fuzzy and prefix index of names, only built when asked for by `load_name_index`
+name_index = None
+
+
+def load_data(directory, compact=False, cache=False, lean=False):
     """
     Load data from CSV files into memory.
+
+    With `compact`, the adjacency is stored in a `CompactGraph` instead of
+    the per-person and per-movie sets. With `cache`, the parsed data is
+    read from a binary snapshot next to the CSV files, which is (re)written
+    whenever it is missing or older than the files, and the graph is always
+    kept compact, as building the sets would cost more than the snapshot
+    saves: only loading with neither fills the sets. With `lean`, the files
+    are streamed into a `CompactGraph` and `names` only, and everything
+    else is read back from the files by `person_info` and `movie_info`.
+    """
+    global graph
+
+    if lean:
+        read_lean(directory)
+        return
+    if not cache:
+        read_csv(directory, compact)
+        return
+
+    snapshot = read_snapshot(directory)
+    if snapshot is None:
+        read_csv(directory, compact=True)
+        tables = (
+            [(person_id, person["name"], person["birth"])
+             for person_id, person in people.items()],
+            [(movie_id, movie["title"], movie["year"])
+             for movie_id, movie in movies.items()]
+        )
+        write_snapshot(directory, tables, graph.arrays())
+    else:
+        (people_rows, movie_rows), arrays = snapshot
+        for person_id, name, birth in people_rows:
+            people[person_id] = {"name": name, "birth": birth}
+            names.setdefault(name.lower(), set()).add(person_id)
+        for movie_id, title, year in movie_rows:
+            movies[movie_id] = {"title": title, "year": year}
+        graph = CompactGraph.from_arrays(people, movies, arrays)
+        component_sizes[:] = graph.component_sizes
+
+
+def load_landmarks(directory, landmark_count=32):
+    """
+    Loads (or builds and stores) the landmark distance index of the
+    loaded data, which the "astar" search and the distance bounds need.
     """
+    global landmarks
+    landmarks = LandmarkIndex.load(directory, compact_graph(), landmark_count)
+
+
+def load_name_index():
+    """Builds the index `person_id_for_name` suggests names from."""
+    global name_index
+    name_index = NameIndex(names)
+
+
+def compact_graph():
+    """
+    Returns the loaded data as a `CompactGraph`,
+    building one from the movies sets if needed.
+    """
+    if graph is not None:
+        return graph
+    return CompactGraph(
+        people, movies,
+        ((person_id, movie_id)
+         for person_id in people for movie_id in people[person_id]["movies"])
+    )
+
+
+def read_lean(directory):
+    """
+    Streams the CSV files of `directory`, keeping the graph, the names and
+    the byte offset of every row but no other columns.
+    """
+    global graph, person_rows, movie_rows
+
+    person_rows = CsvRows(f"{directory}/people.csv")
+    person_ids = []
+    for row in person_rows:
+        person_ids.append(row["id"])
+        names.setdefault(row["name"].lower(), set()).add(row["id"])
+
+    movie_rows = CsvRows(f"{directory}/movies.csv")
+    movie_ids = [row["id"] for row in movie_rows]
+
+    star_rows = CsvRows(f"{directory}/stars.csv")
+    graph = CompactGraph(
+        person_ids, movie_ids,
+        ((row["person_id"], row["movie_id"]) for row in star_rows)
+    )
+    component_sizes[:] = graph.component_sizes
+
+
+def read_csv(directory, compact):
+    """
+    Parses the CSV files of `directory`, storing the adjacency in
+    a `CompactGraph` if `compact` and in sets otherwise.
+    """
+    global graph
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
             people[row["id"]] = {
                 "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
+                "birth": row["birth"]
             }
+            if not compact:
+                people[row["id"]]["movies"] = set()
             if row["name"].lower() not in names:
                 names[row["name"].lower()] = {row["id"]}
             else:
@@ -37,13 +166,21 @@ def load_data(directory):
         for row in reader:
             movies[row["id"]] = {
                 "title": row["title"],
-                "year": row["year"],
-                "stars": set()
+                "year": row["year"]
             }
+            if not compact:
+                movies[row["id"]]["stars"] = set()
 
     # Load stars
     with open(f"{directory}/stars.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
+        if compact:
+            graph = CompactGraph(
+                people, movies,
+                ((row["person_id"], row["movie_id"]) for row in reader)
+            )
+            component_sizes[:] = graph.component_sizes
+            return
         for row in reader:
             try:
                 people[row["person_id"]]["movies"].add(row["movie_id"])
@@ -51,16 +188,54 @@ def load_data(directory):
             except KeyError:
                 pass
 
+    # Label connected components once, so disconnected queries are instant
+    index = {person_id: i for i, person_id in enumerate(people)}
+    labels, sizes = label_components(
+        len(index),
+        ([index[person_id] for person_id in movie["stars"]] for movie in movies.values())
+    )
+    for person_id, i in index.items():
+        people[person_id]["component"] = labels[i]
+    component_sizes[:] = sizes
+
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser()
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--search", choices=SEARCHES, default="bfs")
+    parser.add_argument("--compact", action="store_true",
+                        help="store the graph in integer CSR arrays")
+    parser.add_argument("--no-cache", dest="cache", action="store_false",
+                        help="always parse the CSV files, ignoring snapshots")
+    parser.add_argument("--landmarks", type=int, default=0, metavar="N",
+                        help="use a distance index of N landmark people")
+    parser.add_argument("--components", action="store_true",
+                        help="report the sizes of the connected components")
+    parser.add_argument("--fuzzy", action="store_true",
+                        help="suggest similar names for unknown people")
+    parser.add_argument("--lean", action="store_true",
+                        help="keep only the graph and names in memory")
+    parser.add_argument("--all", action="store_true",
+                        help="print every shortest connection")
+    parser.add_argument("--paths", type=int, default=0, metavar="K",
+                        help="print the K shortest connections")
+    args = parser.parse_args()
+    if args.search == "astar" and not args.landmarks:
+        parser.error("--search astar needs --landmarks")
+    directory = args.directory
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    load_data(directory, compact=args.compact, cache=args.cache, lean=args.lean)
+    if args.landmarks:
+        load_landmarks(directory, args.landmarks)
+    if args.fuzzy:
+        load_name_index()
     print("Data loaded.")
+    if args.components:
+        sizes = sorted(component_sizes, reverse=True)
+        print(f"{sum(sizes)} people in {len(sizes)} connected components.")
+        print("Largest components: " + ", ".join(str(size) for size in sizes[:10]))
 
     source = person_id_for_name(input("Name: "))
     if source is None:
@@ -69,24 +244,58 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    if landmarks is not None:
+        lower, upper = landmarks.distance_bounds(source, target)
+        if lower == math.inf:
+            sys.exit("Not connected.")
+        elif upper < math.inf:
+            print(f"Between {lower} and {upper} degrees of separation.")
+
+    if args.all or args.paths:
+        if args.all:
+            found = all_shortest_paths(source, target)
+        else:
+            found = k_shortest_paths(source, target, args.paths)
+        total = 0
+        for total, path in enumerate(found, start=1):
+            print(f"Connection {total}:")
+            print_path(source, path)
+        if not total:
+            print("Not connected.")
+        return
+
+    path = SEARCHES[args.search](source, target)
 
     if path is None:
         print("Not connected.")
     else:
-        degrees = len(path)
-        print(f"{degrees} degrees of separation.")
-        path = [(None, source)] + path
-        for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
-            print(f"{i + 1}: {person1} and {person2} starred in {movie}")
-
-
-def shortest_path(source, target):
-    """Finds the shortest path between the source actor and the target actor"""
-    
+        print_path(source, path)
+
+
+def print_path(source, path):
+    """Prints the degrees of separation and each step of a path."""
+    degrees = len(path)
+    print(f"{degrees} degrees of separation.")
+    path = [(None, source)] + path
+    for i in range(degrees):
+        person1 = person_info(path[i][1])["name"]
+        person2 = person_info(path[i + 1][1])["name"]
+        movie = movie_info(path[i + 1][0])["title"]
+        print(f"{i + 1}: {person1} and {person2} starred in {movie}")
+
+
+def shortest_path(source, target, stats=None):
+    """
+    Finds the shortest path between the source actor and the target actor.
+
+    If `stats` is a dict, the number of expanded people is stored
+    under its "expanded" key.
+    """
+    if not connected(source, target):
+        return None
+    if graph is not None:
+        return graph.shortest_path(source, target, stats)
+
     # Initializate frontier 
     start = Node(state=source, parent=None, movie=None)
     frontier = QueueFrontier()
@@ -106,6 +315,8 @@ def shortest_path(source, target):
         
         # Choose a node from the frontier
         node = frontier.remove()
+        if stats is not None:
+            stats["expanded"] = stats.get("expanded", 0) + 1
 
         # Here, we check if we found the solution
         if node.state == target:
@@ -126,6 +337,193 @@ def shortest_path(source, target):
                 frontier.add(child)
 
 
+def shortest_paths(source, targets, stats=None):
+    """
+    Finds the shortest paths from the source actor to every target actor
+    with a single breadth-first search, stopping once all targets are found.
+
+    Returns a dictionary of target: path, where unreachable targets map
+    to None and each path is a list of (movie_id, person_id) pairs.
+    """
+    paths = dict.fromkeys(targets)
+    remaining = {target for target in paths if connected(source, target)}
+    if not remaining:
+        return paths
+    if graph is not None:
+        paths.update(graph.shortest_paths(source, remaining, stats))
+        return paths
+
+    # Maps each reached person to the (movie_id, person_id) it came from
+    parents = {source: None}
+    frontier = deque([source])
+
+    while frontier and remaining:
+        person_id = frontier.popleft()
+        if stats is not None:
+            stats["expanded"] = stats.get("expanded", 0) + 1
+
+        # Targets found here are still expanded while others remain
+        if person_id in remaining:
+            remaining.remove(person_id)
+            paths[person_id] = follow_parents(parents, person_id)
+            if not remaining:
+                break
+
+        for movie_id, neighbor_id in neighbors_for_person(person_id):
+            if neighbor_id not in parents:
+                parents[neighbor_id] = (movie_id, person_id)
+                frontier.append(neighbor_id)
+
+    return paths
+
+
+def follow_parents(parents, person_id):
+    """
+    Returns the (movie_id, person_id) path to `person_id` from the root
+    of a search tree mapping people to the (movie_id, person_id) they
+    were reached from.
+    """
+    solution = []
+    while parents[person_id] is not None:
+        movie_id, parent_id = parents[person_id]
+        solution.append((movie_id, person_id))
+        person_id = parent_id
+    solution.reverse()
+    return solution
+
+
+def shortest_path_bidirectional(source, target, stats=None):
+    """
+    Finds the shortest path between the source actor and the target actor
+    searching from both ends at once, always expanding the smaller frontier
+    one whole layer at a time until the two searches meet.
+
+    Returns the same list of (movie_id, person_id) pairs as `shortest_path`.
+    """
+    if source == target:
+        return []
+    if not connected(source, target):
+        return None
+
+    # Each side maps a reached person to the (movie_id, person_id) it came from
+    forward = {source: None}
+    backward = {target: None}
+    forward_layer = [source]
+    backward_layer = [target]
+
+    while forward_layer and backward_layer:
+
+        # Expand the cheaper side, looking the people up in the other side
+        if len(forward_layer) <= len(backward_layer):
+            layer, parents, others = forward_layer, forward, backward
+        else:
+            layer, parents, others = backward_layer, backward, forward
+
+        next_layer = []
+        for person_id in layer:
+            if stats is not None:
+                stats["expanded"] = stats.get("expanded", 0) + 1
+            for movie_id, neighbor_id in neighbors_for_person(person_id):
+                if neighbor_id in parents:
+                    continue
+                parents[neighbor_id] = (movie_id, person_id)
+
+                # Since both searches grow layer by layer, the first meeting
+                # point already lies on a shortest path
+                if neighbor_id in others:
+                    return join_paths(forward, backward, neighbor_id)
+                next_layer.append(neighbor_id)
+
+        if parents is forward:
+            forward_layer = next_layer
+        else:
+            backward_layer = next_layer
+
+    return None
+
+
+def all_shortest_paths(source, target):
+    """
+    Yields every shortest path between the source actor and the target
+    actor, as lists of (movie_id, person_id) pairs, from a single search.
+    """
+    if not connected(source, target):
+        return iter(())
+    return connections.all_shortest_paths(source, target, neighbors_for_person)
+
+
+def k_shortest_paths(source, target, k):
+    """
+    Yields up to `k` paths between the source actor and the target actor
+    that never visit a person twice, shortest first.
+    """
+    if not connected(source, target):
+        return iter(())
+    return itertools.islice(
+        connections.shortest_paths_in_order(source, target, neighbors_for_person), k
+    )
+
+
+def join_paths(forward, backward, meeting):
+    """
+    Rebuilds the (movie_id, person_id) path of a bidirectional search
+    through the person where both searches met.
+    """
+    # Walk back to the source
+    solution = follow_parents(forward, meeting)
+
+    # Walk forward to the target
+    person_id = meeting
+    while backward[person_id] is not None:
+        movie_id, person_id = backward[person_id]
+        solution.append((movie_id, person_id))
+
+    return solution
+
+
+def shortest_path_astar(source, target, stats=None):
+    """
+    Finds the shortest path between the source actor and the target actor
+    with A*, using the landmark index loaded by `load_landmarks`.
+    """
+    if not connected(source, target):
+        return None
+    return landmarks.shortest_path(source, target, stats)
+
+
+def is_person(person_id):
+    """Returns True if `person_id` is the id of a loaded person."""
+    if graph is not None:
+        return person_id in graph.person_index
+    return person_id in people
+
+
+def person_info(person_id):
+    """Returns the dictionary of a person's name and birth."""
+    if person_rows is None:
+        return people[person_id]
+    return person_rows.get(graph.person_index[person_id])
+
+
+def movie_info(movie_id):
+    """Returns the dictionary of a movie's title and year."""
+    if movie_rows is None:
+        return movies[movie_id]
+    return movie_rows.get(graph.movie_index[movie_id])
+
+
+def component_of(person_id):
+    """Returns the connected component label of a person."""
+    if graph is not None:
+        return graph.components[graph.person_index[person_id]]
+    return people[person_id]["component"]
+
+
+def connected(source, target):
+    """Returns True if there is any path between two people."""
+    return component_of(source) == component_of(target)
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
@@ -133,11 +531,23 @@ def person_id_for_name(name):
     """
     person_ids = list(names.get(name.lower(), set()))
     if len(person_ids) == 0:
-        return None
+        if name_index is None:
+            return None
+        candidates = name_index.lookup(name)
+        if not candidates:
+            return None
+        print(f"No '{name}'. Did you mean:")
+        for candidate, score in candidates:
+            person = person_info(next(iter(names[candidate])))
+            print(f"Name: {person['name']}, Score: {score:.2f}")
+        name = input("Intended Name: ")
+        if not names.get(name.lower()):
+            return None
+        return person_id_for_name(name)
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
         for person_id in person_ids:
-            person = people[person_id]
+            person = person_info(person_id)
             name = person["name"]
             birth = person["birth"]
             print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
@@ -157,6 +567,9 @@ def neighbors_for_person(person_id):
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        return graph.neighbors_for_person(person_id)
+
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
@@ -165,5 +578,12 @@ def neighbors_for_person(person_id):
     return neighbors
 
 
+# Search algorithms selectable from the command line
+SEARCHES = {
+    "bfs": shortest_path,
+    "bidirectional": shortest_path_bidirectional,
+    "astar": shortest_path_astar,
+}
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,248 @@
+from array import array
+from collections import deque
+
+
+class CompactGraph():
+    """
+    Bipartite people/movies graph with both kinds of ids interned to dense
+    integers and adjacency stored in compressed sparse row (CSR) arrays:
+    the movies of person `p` are `person_movies[person_offsets[p]:person_offsets[p + 1]]`
+    and the stars of movie `m` are `movie_stars[movie_offsets[m]:movie_offsets[m + 1]]`.
+
+    `components[p]` labels the connected component of person `p`, and
+    `component_sizes[c]` is the number of people in component `c`.
+    """
+
+    def __init__(self, person_ids, movie_ids, stars):
+        """
+        Builds the graph from the lists of person and movie ids and an
+        iterable of (person_id, movie_id) pairs. Pairs naming an unknown
+        person or movie are ignored, as `load_data` does.
+        """
+        self.person_ids = list(person_ids)
+        self.movie_ids = list(movie_ids)
+        self.person_index = {person_id: i for i, person_id in enumerate(self.person_ids)}
+        self.movie_index = {movie_id: i for i, movie_id in enumerate(self.movie_ids)}
+
+        # Intern the pairs into two flat arrays, dropping unknown ids
+        edge_people = array("i")
+        edge_movies = array("i")
+        for person_id, movie_id in stars:
+            person = self.person_index.get(person_id)
+            movie = self.movie_index.get(movie_id)
+            if person is not None and movie is not None:
+                edge_people.append(person)
+                edge_movies.append(movie)
+
+        self.person_offsets, self.person_movies = csr(
+            len(self.person_ids), edge_people, edge_movies
+        )
+        del edge_people, edge_movies
+
+        # The transpose of the deduplicated person rows has no duplicates
+        self.movie_offsets, self.movie_stars = csr(
+            len(self.movie_ids), self.person_movies, self.row_numbers()
+        )
+        self.components, self.component_sizes = label_components(
+            len(self.person_ids),
+            (self.stars_for(movie) for movie in range(len(self.movie_ids)))
+        )
+
+    @classmethod
+    def from_arrays(cls, person_ids, movie_ids, arrays):
+        """
+        Rebuilds a graph from its id lists and the CSR sequences returned
+        by `arrays()`, which may be any int sequences such as memoryviews.
+        """
+        graph = cls.__new__(cls)
+        graph.person_ids = list(person_ids)
+        graph.movie_ids = list(movie_ids)
+        graph.person_index = {person_id: i for i, person_id in enumerate(graph.person_ids)}
+        graph.movie_index = {movie_id: i for i, movie_id in enumerate(graph.movie_ids)}
+        graph.person_offsets = arrays["person_offsets"]
+        graph.person_movies = arrays["person_movies"]
+        graph.movie_offsets = arrays["movie_offsets"]
+        graph.movie_stars = arrays["movie_stars"]
+        graph.components = arrays["components"]
+        graph.component_sizes = arrays["component_sizes"]
+        return graph
+
+    def arrays(self):
+        """Returns a dictionary of name: array, CSR and component labels."""
+        return {
+            "person_offsets": self.person_offsets,
+            "person_movies": self.person_movies,
+            "movie_offsets": self.movie_offsets,
+            "movie_stars": self.movie_stars,
+            "components": self.components,
+            "component_sizes": self.component_sizes
+        }
+
+    def row_numbers(self):
+        """Returns the person index of every entry of `person_movies`."""
+        people = array("i", [0]) * len(self.person_movies)
+        for person in range(len(self.person_ids)):
+            for i in range(self.person_offsets[person], self.person_offsets[person + 1]):
+                people[i] = person
+        return people
+
+    def movies_for(self, person):
+        """Returns the indices of the movies a person index starred in."""
+        return self.person_movies[self.person_offsets[person]:self.person_offsets[person + 1]]
+
+    def stars_for(self, movie):
+        """Returns the indices of the people starring in a movie index."""
+        return self.movie_stars[self.movie_offsets[movie]:self.movie_offsets[movie + 1]]
+
+    def neighbors_for_person(self, person_id):
+        """
+        Returns (movie_id, person_id) pairs for people
+        who starred with a given person.
+        """
+        neighbors = set()
+        for movie in self.movies_for(self.person_index[person_id]):
+            movie_id = self.movie_ids[movie]
+            for person in self.stars_for(movie):
+                neighbors.add((movie_id, self.person_ids[person]))
+        return neighbors
+
+    def shortest_path(self, source, target, stats=None):
+        """
+        Breadth-first search over the integer graph, returning the same
+        list of (movie_id, person_id) pairs as `degrees.shortest_path`.
+        """
+        return self.shortest_paths(source, [target], stats)[target]
+
+    def shortest_paths(self, source, targets, stats=None):
+        """
+        Breadth-first search from `source` that stops once every target is
+        reached, returning a dictionary of target: path (None if unreachable).
+
+        Every movie is scanned at most once: the first time it is reached
+        all of its stars are queued, so later visits could add nobody new.
+        """
+        paths = dict.fromkeys(targets)
+        source = self.person_index[source]
+        remaining = {self.person_index[target] for target in paths}
+
+        # parent_person[p] is -1 until p is reached; the source is its own parent
+        parent_person = array("i", [-1]) * len(self.person_ids)
+        parent_movie = array("i", [-1]) * len(self.person_ids)
+        seen_movies = bytearray(len(self.movie_ids))
+        parent_person[source] = source
+
+        person_offsets, person_movies = self.person_offsets, self.person_movies
+        movie_offsets, movie_stars = self.movie_offsets, self.movie_stars
+
+        frontier = deque([source])
+        while frontier and remaining:
+            person = frontier.popleft()
+            if stats is not None:
+                stats["expanded"] = stats.get("expanded", 0) + 1
+            if person in remaining:
+                remaining.remove(person)
+                paths[self.person_ids[person]] = self.build_path(
+                    parent_person, parent_movie, source, person
+                )
+                if not remaining:
+                    break
+
+            for i in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[i]
+                if seen_movies[movie]:
+                    continue
+                seen_movies[movie] = 1
+                for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                    star = movie_stars[j]
+                    if parent_person[star] == -1:
+                        parent_person[star] = person
+                        parent_movie[star] = movie
+                        frontier.append(star)
+        return paths
+
+    def build_path(self, parent_person, parent_movie, source, target):
+        """Follows the parent arrays from target back to source."""
+        solution = []
+        person = target
+        while person != source:
+            solution.append((self.movie_ids[parent_movie[person]], self.person_ids[person]))
+            person = parent_person[person]
+        solution.reverse()
+        return solution
+
+    def memory_size(self):
+        """Returns the approximate number of bytes held by the arrays."""
+        return sum(
+            len(values) * values.itemsize for values in self.arrays().values()
+        )
+
+
+def label_components(count, groups):
+    """
+    Union-find over `count` items where every item of each group in
+    `groups` is connected to the others. Returns (labels, sizes): the
+    dense component label of every item and the size of every component.
+    """
+    parents = array("i", range(count))
+
+    def find(item):
+        while parents[item] != item:
+            parents[item] = parents[parents[item]]
+            item = parents[item]
+        return item
+
+    for group in groups:
+        group = iter(group)
+        first = next(group, None)
+        if first is None:
+            continue
+        root = find(first)
+        for item in group:
+            other = find(item)
+            if other != root:
+                parents[other] = root
+
+    # Number the roots in order of first appearance
+    labels = array("i", [-1]) * count
+    sizes = array("i")
+    for item in range(count):
+        root = find(item)
+        if labels[root] == -1:
+            labels[root] = len(sizes)
+            sizes.append(0)
+        labels[item] = labels[root]
+        sizes[labels[item]] += 1
+    return labels, sizes
+
+
+def csr(rows, row_of, column_of):
+    """
+    Returns the (offsets, columns) arrays of a CSR adjacency with `rows`
+    rows from the parallel sequences `row_of` and `column_of`, one entry
+    per edge, dropping duplicate edges.
+    """
+    offsets = array("i", [0]) * (rows + 1)
+    for row in row_of:
+        offsets[row + 1] += 1
+    for row in range(rows):
+        offsets[row + 1] += offsets[row]
+
+    columns = array("i", [0]) * len(row_of)
+    fill = array("i", offsets)
+    for row, column in zip(row_of, column_of):
+        columns[fill[row]] = column
+        fill[row] += 1
+
+    # Squeeze out duplicates row by row, rows are short
+    write = 0
+    start = 0
+    for row in range(rows):
+        end = offsets[row + 1]
+        offsets[row] = write
+        for column in sorted(set(columns[start:end])):
+            columns[write] = column
+            write += 1
+        start = end
+    offsets[rows] = write
+    del columns[write:]
+    return offsets, columns
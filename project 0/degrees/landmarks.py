@@ -0,0 +1,180 @@
+"""
+Landmark (ALT) distance index for the degrees graph.
+
+A few high-degree people are picked as landmarks and the distance from each
+landmark to every person is stored, one byte per person. By the triangle
+inequality, |d(L, s) - d(L, t)| <= d(s, t) <= d(L, s) + d(L, t) for every
+landmark L, which bounds a query without searching and gives A* a
+consistent heuristic.
+"""
+
+import heapq
+import math
+from array import array
+from collections import deque
+from itertools import count
+
+from snapshot import read_snapshot, write_snapshot
+
+LANDMARKS_NAME = "degrees.landmarks"
+
+# Distances are stored in one byte; FAR means "at least this far",
+# UNREACHABLE means not connected to the landmark at all
+FAR = 254
+UNREACHABLE = 255
+
+
+class LandmarkIndex():
+
+    def __init__(self, graph, landmarks, distances):
+        """
+        Wraps a `CompactGraph` with the person indices of its landmarks and
+        one sequence of byte distances (indexed by person) per landmark.
+        """
+        self.graph = graph
+        self.landmarks = list(landmarks)
+        self.distances = list(distances)
+
+    @classmethod
+    def build(cls, graph, landmark_count=32):
+        """
+        Picks the `landmark_count` people with the most co-stars,
+        never two from the same movie, and runs a BFS from each.
+        """
+        def costars(person):
+            return sum(len(graph.stars_for(movie)) for movie in graph.movies_for(person))
+
+        landmarks = []
+        taken_movies = set()
+        for person in sorted(range(len(graph.person_ids)), key=costars, reverse=True):
+            if len(landmarks) == landmark_count:
+                break
+            movies = set(graph.movies_for(person))
+            if not movies & taken_movies:
+                landmarks.append(person)
+                taken_movies |= movies
+
+        return cls(graph, landmarks, [bfs_distances(graph, landmark) for landmark in landmarks])
+
+    @classmethod
+    def load(cls, directory, graph, landmark_count=32):
+        """
+        Returns the index stored next to the CSV files of `directory`,
+        building and storing it first if it is missing or out of date.
+        """
+        snapshot = read_snapshot(directory, LANDMARKS_NAME)
+        if snapshot is not None:
+            landmark_ids, arrays = snapshot
+            if len(landmark_ids) == landmark_count:
+                landmarks = [graph.person_index[person_id] for person_id in landmark_ids]
+                return cls(graph, landmarks, [arrays[person_id] for person_id in landmark_ids])
+
+        index = cls.build(graph, landmark_count)
+        landmark_ids = [graph.person_ids[landmark] for landmark in index.landmarks]
+        write_snapshot(directory, landmark_ids, dict(zip(landmark_ids, index.distances)),
+                       LANDMARKS_NAME)
+        return index
+
+    def memory_size(self):
+        """Returns the number of bytes held by the distance tables."""
+        return sum(len(distances) for distances in self.distances)
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the distance between two person
+        indices. `lower` is infinite if they are known not to be connected,
+        `upper` is infinite if no landmark reaches both.
+        """
+        lower, upper = 0, math.inf
+        for distances in self.distances:
+            to_source, to_target = distances[source], distances[target]
+            if (to_source == UNREACHABLE) != (to_target == UNREACHABLE):
+                return math.inf, math.inf
+            if to_source == UNREACHABLE or FAR in (to_source, to_target):
+                continue
+            lower = max(lower, abs(to_source - to_target))
+            upper = min(upper, to_source + to_target)
+        return lower, upper
+
+    def distance_bounds(self, source_id, target_id):
+        """Returns `bounds` for two person ids."""
+        index = self.graph.person_index
+        return self.bounds(index[source_id], index[target_id])
+
+    def shortest_path(self, source_id, target_id, stats=None):
+        """
+        A* search guided by the landmark lower bounds, returning the same
+        list of (movie_id, person_id) pairs as `degrees.shortest_path`.
+        """
+        graph = self.graph
+        source = graph.person_index[source_id]
+        target = graph.person_index[target_id]
+
+        lower, upper = self.bounds(source, target)
+        if lower == math.inf:
+            return None
+
+        # Every step costs one, so heuristic values are cached per person
+        estimates = {}
+
+        def estimate(person):
+            if person not in estimates:
+                estimates[person] = self.bounds(person, target)[0]
+            return estimates[person]
+
+        # Ties on f prefer the deeper person, then insertion order
+        tie = count()
+        costs = {source: 0}
+        parents = {source: None}
+        frontier = [(lower, 0, next(tie), source)]
+        closed = set()
+
+        while frontier:
+            _, negative_cost, _, person = heapq.heappop(frontier)
+            if person in closed:
+                continue
+            closed.add(person)
+            if stats is not None:
+                stats["expanded"] = stats.get("expanded", 0) + 1
+
+            if person == target:
+                solution = []
+                while parents[person] is not None:
+                    movie, parent = parents[person]
+                    solution.append((graph.movie_ids[movie], graph.person_ids[person]))
+                    person = parent
+                solution.reverse()
+                return solution
+
+            cost = 1 - negative_cost
+            for movie in graph.movies_for(person):
+                for star in graph.stars_for(movie):
+                    if star in closed or costs.get(star, math.inf) <= cost:
+                        continue
+                    distance = estimate(star)
+                    if distance == math.inf:
+                        continue
+                    costs[star] = cost
+                    parents[star] = (movie, person)
+                    heapq.heappush(frontier, (cost + distance, -cost, next(tie), star))
+        return None
+
+
+def bfs_distances(graph, source):
+    """Returns the byte distances from person index `source` to everyone."""
+    distances = array("B", [UNREACHABLE]) * len(graph.person_ids)
+    seen_movies = bytearray(len(graph.movie_ids))
+    distances[source] = 0
+    frontier = deque([source])
+    while frontier:
+        person = frontier.popleft()
+        distance = min(distances[person] + 1, FAR)
+        for movie in graph.movies_for(person):
+            if seen_movies[movie]:
+                continue
+            seen_movies[movie] = 1
+            for star in graph.stars_for(movie):
+                if distances[star] == UNREACHABLE:
+                    distances[star] = distance
+                    frontier.append(star)
+    return distances
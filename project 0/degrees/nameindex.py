@@ -0,0 +1,74 @@
+"""
+Prefix and trigram index over the lowercase names of the degrees dataset,
+for suggesting people when a name is misspelled or only partly typed.
+"""
+
+import bisect
+import heapq
+from array import array
+from collections import Counter
+
+# How many candidates per requested result are scored exactly
+SHORTLIST = 10
+
+
+class NameIndex():
+
+    def __init__(self, names):
+        """Indexes an iterable of lowercase names."""
+        self.names = sorted(set(names))
+
+        # Maps each trigram to the positions of the names containing it
+        postings = {}
+        for position, name in enumerate(self.names):
+            for trigram in trigrams(name):
+                postings.setdefault(trigram, []).append(position)
+        self.postings = {
+            trigram: array("i", positions) for trigram, positions in postings.items()
+        }
+
+    def prefix(self, text, k=5):
+        """Returns up to `k` names starting with `text`, shortest first."""
+        text = text.lower()
+        start = bisect.bisect_left(self.names, text)
+        end = bisect.bisect_left(self.names, text + "\uffff")
+        return heapq.nsmallest(k, (self.names[i] for i in range(start, end)), key=len)
+
+    def lookup(self, text, k=5):
+        """
+        Returns up to `k` (name, score) candidates for `text`, best first.
+
+        The score is the Dice coefficient of the trigram sets of `text` and
+        the name, raised to the fraction of the name covered by `text` for
+        names it is a prefix of; an exact match scores 1.
+        """
+        text = text.lower().strip()
+        query = trigrams(text)
+        if not query:
+            return []
+
+        # Any name sharing most of the query's trigrams shares one of its
+        # rarest half, so only those posting lists are counted to shortlist
+        # candidates, which are then scored exactly
+        ordered = sorted(query, key=lambda trigram: len(self.postings.get(trigram, ())))
+        shared = Counter()
+        for trigram in ordered[:len(ordered) // 2 + 1]:
+            shared.update(self.postings.get(trigram, ()))
+        shortlist = heapq.nlargest(SHORTLIST * k, shared, key=shared.__getitem__)
+
+        scores = {}
+        for position in shortlist:
+            name = self.names[position]
+            candidate = trigrams(name)
+            scores[name] = 2 * len(query & candidate) / (len(query) + len(candidate))
+        for name in self.prefix(text, k):
+            scores[name] = max(scores.get(name, 0), len(text) / len(name))
+
+        best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return best[:k]
+
+
+def trigrams(name):
+    """Returns the set of three-character windows of a padded name."""
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
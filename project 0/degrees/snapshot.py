@@ -0,0 +1,125 @@
+"""
+Versioned binary snapshots of a parsed degrees dataset.
+
+A snapshot file is laid out as:
+
+    MAGIC | header length (8 bytes) | JSON header | pickled tables | arrays
+
+The header records the snapshot version, the size and modification time of
+every source CSV file, and where each section lives in the file. Arrays are
+returned as memoryviews over a memory map, so they are paged in lazily.
+
+Indexes derived from the dataset are stored the same way under other names.
+"""
+
+import json
+import mmap
+import os
+import pickle
+import struct
+
+MAGIC = b"DEGREES\0"
+SNAPSHOT_VERSION = 3
+SNAPSHOT_NAME = "degrees.snapshot"
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+HEADER_LENGTH = struct.Struct("<Q")
+ALIGNMENT = 8
+
+
+def snapshot_path(directory, name=SNAPSHOT_NAME):
+    """Returns where the snapshot `name` of `directory` is stored."""
+    return os.path.join(directory, name)
+
+
+def source_stats(directory):
+    """Returns the [size, mtime_ns] of every source CSV file in `directory`."""
+    stats = {}
+    for name in SOURCES:
+        stat = os.stat(os.path.join(directory, name))
+        stats[name] = [stat.st_size, stat.st_mtime_ns]
+    return stats
+
+
+def write_snapshot(directory, tables, arrays, name=SNAPSHOT_NAME):
+    """
+    Writes a snapshot of `directory` holding `tables` (any picklable object)
+    and `arrays` (a dictionary of name: array.array or typed memoryview).
+
+    The file is written next to the sources and moved into place atomically.
+    Returns False, leaving no snapshot behind, if it can't be written.
+    """
+    blob = pickle.dumps(tables, protocol=pickle.HIGHEST_PROTOCOL)
+    sections = {}
+    offset = 0
+    for key, values in arrays.items():
+        offset = align(offset)
+        sections[key] = [offset, len(values), typecode(values)]
+        offset += len(values) * values.itemsize
+
+    header = {
+        "version": SNAPSHOT_VERSION,
+        "sources": source_stats(directory),
+        "tables": len(blob),
+        "arrays": sections
+    }
+    encoded = json.dumps(header).encode("utf-8")
+    start = align(len(MAGIC) + HEADER_LENGTH.size + len(encoded) + len(blob))
+
+    path = snapshot_path(directory, name)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(MAGIC)
+            f.write(HEADER_LENGTH.pack(len(encoded)))
+            f.write(encoded)
+            f.write(blob)
+            for key, values in arrays.items():
+                f.write(bytes(start + sections[key][0] - f.tell()))
+                f.write(values)
+        os.replace(temporary, path)
+    except OSError:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        return False
+    return True
+
+
+def read_snapshot(directory, name=SNAPSHOT_NAME):
+    """
+    Returns the (tables, arrays) stored in the snapshot `name` of `directory`,
+    or None if there is no snapshot, it was written by another version,
+    or any source file changed since it was written.
+    """
+    try:
+        with open(snapshot_path(directory, name), "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            length, = HEADER_LENGTH.unpack(f.read(HEADER_LENGTH.size))
+            header = json.loads(f.read(length))
+            if (header["version"] != SNAPSHOT_VERSION
+                    or header["sources"] != source_stats(directory)):
+                return None
+            tables = pickle.loads(f.read(header["tables"]))
+            start = align(f.tell())
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError, KeyError, struct.error, pickle.UnpicklingError):
+        return None
+
+    arrays = {}
+    view = memoryview(mapped)
+    for key, (offset, count, code) in header["arrays"].items():
+        begin = start + offset
+        size = count * struct.calcsize(code)
+        arrays[key] = view[begin:begin + size].cast(code)
+    return tables, arrays
+
+
+def typecode(values):
+    """Returns the type code of an array.array or a memoryview."""
+    return getattr(values, "typecode", None) or values.format
+
+
+def align(offset):
+    """Rounds `offset` up to the next multiple of ALIGNMENT."""
+    return -(-offset // ALIGNMENT) * ALIGNMENT
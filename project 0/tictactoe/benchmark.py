@@ -0,0 +1,88 @@
+"""
+Measures how long the AI takes to choose the first move on an empty board,
+how many positions per second each search engine visits, and how long the
+opening book takes to answer instead.
+
+Usage: python benchmark.py [repeats]
+"""
+
+import sys
+import time
+
+import bitboard
+import openingbook
+import tictactoe as ttt
+
+
+def first_move_seconds(repeats):
+    """Returns the best time of `repeats` minimax calls on an empty board."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        ttt.minimax(ttt.initial_state())
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def classic_nodes_per_second():
+    """Runs a full uncached classic search, returning (nodes, nodes per second)."""
+    ttt.use_cache = False
+    ttt.search_stats["nodes"] = 0
+    start = time.perf_counter()
+    ttt.max_value(ttt.initial_state())
+    seconds = time.perf_counter() - start
+    ttt.use_cache = True
+    return ttt.search_stats["nodes"], ttt.search_stats["nodes"] / seconds
+
+
+def bitboard_nodes_per_second():
+    """Runs a full bitboard search without its table, returning (nodes, nodes per second)."""
+    stats = {"nodes": 0}
+    search = bitboard.Search(bitboard.Position(), None, stats=stats)
+    start = time.perf_counter()
+    search.negamax(9, -bitboard.WIN - 1, bitboard.WIN + 1)
+    seconds = time.perf_counter() - start
+    return stats["nodes"], stats["nodes"] / seconds
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python benchmark.py [repeats]")
+    repeats = int(sys.argv[1]) if len(sys.argv) == 2 else 3
+
+    ttt.use_book = False
+    ttt.engine = "classic"
+    ttt.use_cache = False
+    print(f"Classic, no cache: {first_move_seconds(repeats) * 1000:.1f}ms")
+
+    ttt.use_cache = True
+    ttt.clear_cache()
+    print(f"Classic, cold cache: {first_move_seconds(1) * 1000:.1f}ms")
+    print(f"Classic, warm cache: {first_move_seconds(repeats) * 1000:.1f}ms")
+
+    hits, misses = ttt.cache_stats["hits"], ttt.cache_stats["misses"]
+    print(f"{len(ttt.transpositions)} positions cached, "
+          f"{hits / (hits + misses):.1%} hit rate over {hits + misses} lookups")
+
+    ttt.engine = "bitboard"
+    bitboard.tables.clear()
+    print(f"Bitboard, cold table: {first_move_seconds(1) * 1000:.1f}ms")
+    print(f"Bitboard, warm table: {first_move_seconds(repeats) * 1000:.1f}ms")
+
+    for name, measure in (("Classic", classic_nodes_per_second),
+                          ("Bitboard", bitboard_nodes_per_second)):
+        nodes, rate = measure()
+        print(f"{name} search: {nodes} nodes, {rate:,.0f} nodes per second")
+
+    start = time.perf_counter()
+    openingbook.solve()
+    print(f"Solving the opening book: {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    ttt.use_book = True
+    ttt.book = None
+    print(f"Opening book, first use: {first_move_seconds(1) * 1000:.3f}ms")
+    print(f"Opening book: {first_move_seconds(repeats) * 1000:.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
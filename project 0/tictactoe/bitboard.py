@@ -0,0 +1,291 @@
+"""
+Bitboard engine for m,n,k games: Tic Tac Toe on a board of any size,
+won by `length` marks in a row.
+
+A position is two integers, one per player, where bit i * columns + j is
+set if the player has a mark in cell (i, j). Wins are checked against
+precomputed masks of every line of `length` cells, and the search plays
+and takes back moves in place on a single `Position` instead of copying
+boards.
+
+Boards small enough are solved exactly. On larger ones the search deepens
+one ply at a time until its time budget runs out, ordering moves by the
+previous iteration and scoring the positions at its depth limit with a
+heuristic over the lines still open to each player.
+"""
+
+import functools
+import time
+
+X = "X"
+O = "O"
+
+# Score of a won position, far above any heuristic value
+WIN = 1000000
+
+# Heuristic weight of an open line holding some marks of only one player,
+# by number of marks (scaled up so longer lines always dominate)
+LINE_WEIGHTS = (0, 1, 10, 100, 1000, 10000, 100000)
+
+# Kinds of values stored in the transposition table
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = -1
+
+# Nodes searched between two looks at the clock
+CLOCK_INTERVAL = 1024
+
+# Entries a transposition table may hold before it is cleared, well above
+# the 5478 positions of a 3x3 game so that one stays solved across games
+TABLE_SIZE = 1 << 16
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when its time budget is spent or it is stopped."""
+    pass
+
+
+@functools.lru_cache(maxsize=None)
+def win_masks(rows, columns, length):
+    """Returns the masks of every line of `length` cells on the board."""
+    masks = []
+    for i in range(rows):
+        for j in range(columns):
+            for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                end_i, end_j = i + di * (length - 1), j + dj * (length - 1)
+                if 0 <= end_i < rows and 0 <= end_j < columns:
+                    mask = 0
+                    for step in range(length):
+                        mask |= 1 << ((i + di * step) * columns + j + dj * step)
+                    masks.append(mask)
+    return tuple(masks)
+
+
+@functools.lru_cache(maxsize=None)
+def move_order(rows, columns):
+    """Returns every cell, those closest to the center first."""
+    center_i, center_j = (rows - 1) / 2, (columns - 1) / 2
+    cells = range(rows * columns)
+    return tuple(sorted(
+        cells, key=lambda cell: max(abs(cell // columns - center_i),
+                                    abs(cell % columns - center_j))
+    ))
+
+
+def to_bits(board):
+    """Returns the (x, o) bitboards of a list-of-lists board."""
+    columns = len(board[0])
+    x = o = 0
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell == X:
+                x |= 1 << (i * columns + j)
+            elif cell == O:
+                o |= 1 << (i * columns + j)
+    return x, o
+
+
+def has_won(bits, masks):
+    """Returns True if the marks in `bits` complete any of the `masks`."""
+    for mask in masks:
+        if bits & mask == mask:
+            return True
+    return False
+
+
+def count_marks(bits):
+    return bin(bits).count("1")
+
+
+class Position():
+    """
+    A mutable position: `bits[0]` holds X's marks, `bits[1]` O's,
+    and `turn` is the index of the player to move.
+    """
+
+    def __init__(self, rows=3, columns=3, length=3, x=0, o=0):
+        self.rows = rows
+        self.columns = columns
+        self.masks = win_masks(rows, columns, length)
+        self.order = move_order(rows, columns)
+        self.full_bits = (1 << (rows * columns)) - 1
+        self.bits = [x, o]
+        self.turn = count_marks(x | o) % 2
+        self.history = []
+
+    def moves(self):
+        """Returns the free cells, in search order."""
+        taken = self.bits[0] | self.bits[1]
+        return [cell for cell in self.order if not taken >> cell & 1]
+
+    def make(self, cell):
+        """Plays `cell` for the player to move."""
+        self.bits[self.turn] |= 1 << cell
+        self.history.append(cell)
+        self.turn ^= 1
+
+    def unmake(self):
+        """Takes back the last move."""
+        self.turn ^= 1
+        self.bits[self.turn] &= ~(1 << self.history.pop())
+
+    def last_mover_won(self):
+        """Returns True if the player who just moved completed a line."""
+        return has_won(self.bits[self.turn ^ 1], self.masks)
+
+    def full(self):
+        return self.bits[0] | self.bits[1] == self.full_bits
+
+    def evaluate(self):
+        """
+        Heuristic value for the player to move: lines only they can still
+        complete count for them, lines only the opponent can count against.
+        """
+        mine, theirs = self.bits[self.turn], self.bits[self.turn ^ 1]
+        score = 0
+        for mask in self.masks:
+            if not theirs & mask:
+                score += LINE_WEIGHTS[min(count_marks(mine & mask), 6)]
+            elif not mine & mask:
+                score -= LINE_WEIGHTS[min(count_marks(theirs & mask), 6)]
+        return score
+
+
+class Search():
+    """
+    One iterative-deepening alpha-beta search, with an optional
+    transposition table of (depth, value, kind) entries, deadline,
+    and event that stops the search when set from another thread.
+    """
+
+    def __init__(self, position, table, deadline=None, stats=None, stop=None):
+        self.position = position
+        self.table = table
+        self.deadline = deadline
+        self.stop = stop
+        self.stats = stats if stats is not None else {"nodes": 0}
+        self.stats.setdefault("nodes", 0)
+
+        # Set once a depth-limited search had to use the heuristic
+        self.cutoff = False
+
+    def negamax(self, depth, alpha, beta):
+        """
+        Returns the value of the position for the player to move, searching
+        `depth` more plies: +-WIN for proven wins and losses, 0 for draws.
+        """
+        position = self.position
+        self.stats["nodes"] += 1
+        if self.stats["nodes"] % CLOCK_INTERVAL == 0 and self.out_of_time():
+            raise SearchTimeout()
+
+        if position.last_mover_won():
+            return -WIN
+        if position.full():
+            return 0
+        if depth == 0:
+            self.cutoff = True
+            return position.evaluate()
+
+        key = (position.bits[0], position.bits[1])
+        entry = None if self.table is None else self.table.get(key)
+        if entry is not None:
+            entry_depth, value, kind = entry
+            if entry_depth >= depth and (
+                    kind == EXACT
+                    or (kind == LOWER_BOUND and value >= beta)
+                    or (kind == UPPER_BOUND and value <= alpha)):
+
+                # A value from a shallower search than the game's end may
+                # rest on the heuristic, so deeper iterations are still due
+                if entry_depth < count_marks(position.full_bits ^ key[0] ^ key[1]):
+                    self.cutoff = True
+                return value
+        original_alpha = alpha
+
+        value = -WIN - 1
+        for cell in position.moves():
+            position.make(cell)
+            value = max(value, -self.negamax(depth - 1, -beta, -alpha))
+            position.unmake()
+            if value >= beta:
+                break
+            alpha = max(alpha, value)
+
+        if value <= original_alpha:
+            kind = UPPER_BOUND
+        elif value >= beta:
+            kind = LOWER_BOUND
+        else:
+            kind = EXACT
+        if self.table is not None:
+            if len(self.table) >= TABLE_SIZE:
+                self.table.clear()
+            self.table[key] = (depth, value, kind)
+        return value
+
+    def out_of_time(self):
+        """Returns True if the search must give up."""
+        if self.stop is not None and self.stop.is_set():
+            return True
+        return self.deadline is not None and time.perf_counter() > self.deadline
+
+    def root(self, depth, moves):
+        """Returns (value, best move) of a search `depth` plies deep."""
+        best_value, best_cell = -WIN - 1, None
+        for cell in moves:
+            self.position.make(cell)
+            value = -self.negamax(depth - 1, -WIN - 1, -best_value)
+            self.position.unmake()
+            if value > best_value:
+                best_value, best_cell = value, cell
+                if value == WIN:
+                    break
+        return best_value, best_cell
+
+
+# Transposition tables shared by every call to best_move, one per board
+# shape, each cleared whenever it reaches TABLE_SIZE entries
+tables = {}
+
+
+def best_move(board, length=3, time_budget=None, stats=None, stop=None):
+    """
+    Returns the best action (i, j) for the player to move on a
+    list-of-lists board, or None if the game is over.
+
+    Without `time_budget` the game is searched to the end. Otherwise the
+    search deepens until `time_budget` seconds have passed and returns the
+    best move of the deepest completed iteration, as it also does as soon
+    as the `stop` event is set.
+    """
+    rows, columns = len(board), len(board[0])
+    position = Position(rows, columns, length, *to_bits(board))
+    if (position.last_mover_won() or has_won(position.bits[position.turn], position.masks)
+            or position.full()):
+        return None
+
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    table = tables.setdefault((rows, columns, length), {})
+    search = Search(position, table, deadline, stats, stop)
+
+    # Without a deadline there is no point in the shallower iterations
+    moves = position.moves()
+    best_cell = moves[0]
+    depths = range(1, len(moves) + 1) if deadline is not None else [len(moves)]
+    for depth in depths:
+        search.cutoff = False
+        try:
+            value, cell = search.root(depth, moves)
+        except SearchTimeout:
+            break
+        best_cell = cell
+
+        # Try this iteration's best move first in the next one
+        moves.remove(cell)
+        moves.insert(0, cell)
+
+        # The game is decided, or was searched to the end
+        if abs(value) == WIN or not search.cutoff:
+            break
+    return divmod(best_cell, columns)
@@ -0,0 +1,154 @@
+"""
+Opening book for 3x3 Tic Tac Toe: the best move and game value of every
+position, solved once and stored on disk so the AI answers without
+searching.
+
+Positions are numbered in base 3, cell i * 3 + j being digit i * 3 + j
+(0 empty, 1 X, 2 O), and the book is one byte per number:
+
+    MAGIC | byte of position 0 | ... | byte of position 3 ** 9 - 1
+
+A byte holds best cell * 3 + value + 1, the value being that of the
+utility (1 if X wins with best play, -1 if O does, 0 for a draw), or
+NO_ENTRY for positions that are unreachable or already over.
+
+Usage: python openingbook.py [path]
+"""
+
+import os
+import sys
+
+import bitboard
+
+MAGIC = b"TTTBOOK1"
+BOOK_NAME = "tictactoe.book"
+POSITIONS = 3 ** 9
+NO_ENTRY = 255
+
+
+def book_path():
+    """Returns where the book is stored by default, next to this module."""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), BOOK_NAME)
+
+
+def position_number(board):
+    """Returns the base-3 number of a 3x3 list-of-lists board."""
+    number = 0
+    for cell in reversed([cell for row in board for cell in row]):
+        number = number * 3 + (1 if cell == bitboard.X else 2 if cell == bitboard.O else 0)
+    return number
+
+
+def solve():
+    """
+    Solves every position reachable from the empty board,
+    returning the book as a bytearray.
+    """
+    book = bytearray([NO_ENTRY]) * POSITIONS
+    position = bitboard.Position()
+    powers = [3 ** cell for cell in range(9)]
+
+    # Maps (x, o) to the value for the player to move, the number of free
+    # cells left at the end of the game when it is won, so quicker wins
+    # and slower losses are preferred
+    values = {}
+
+    def negamax(number):
+        key = (position.bits[0], position.bits[1])
+        if key in values:
+            return values[key]
+        moves = position.moves()
+        if position.last_mover_won():
+            value = -(len(moves) + 1)
+        elif not moves:
+            value = 0
+        else:
+            value, best_cell = None, None
+            for cell in moves:
+                digit = position.turn + 1
+                position.make(cell)
+                child = -negamax(number + digit * powers[cell])
+                position.unmake()
+                if value is None or child > value:
+                    value, best_cell = child, cell
+
+            # Stored from X's point of view, as utility is
+            outcome = (value > 0) - (value < 0)
+            if position.turn == 1:
+                outcome = -outcome
+            book[number] = best_cell * 3 + outcome + 1
+        values[key] = value
+        return value
+
+    negamax(0)
+    return book
+
+
+def write_book(book, path=None):
+    """
+    Writes `book` to `path`, moving it into place atomically.
+    Returns False if it can't be written.
+    """
+    path = path or book_path()
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(MAGIC)
+            f.write(book)
+        os.replace(temporary, path)
+    except OSError:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        return False
+    return True
+
+
+def read_book(path=None):
+    """Returns the book stored at `path`, or None if it is missing or invalid."""
+    try:
+        with open(path or book_path(), "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if data[:len(MAGIC)] != MAGIC or len(data) != len(MAGIC) + POSITIONS:
+        return None
+    return data[len(MAGIC):]
+
+
+def load_book(path=None):
+    """Reads the book from disk, solving and writing it first if needed."""
+    book = read_book(path)
+    if book is None:
+        book = bytes(solve())
+        write_book(book, path)
+    return book
+
+
+def lookup(book, board):
+    """
+    Returns (action, value) for a 3x3 board from `book`,
+    or None if the board has no entry.
+    """
+    entry = book[position_number(board)]
+    if entry == NO_ENTRY:
+        return None
+    cell, value = divmod(entry, 3)
+    return divmod(cell, 3), value - 1
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python openingbook.py [path]")
+    path = sys.argv[1] if len(sys.argv) == 2 else None
+
+    book = solve()
+    entries = sum(1 for entry in book if entry != NO_ENTRY)
+    if not write_book(book, path):
+        sys.exit(f"Could not write {path or book_path()}")
+    print(f"Solved {entries} positions, written to {path or book_path()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,80 @@
+import collections
+import concurrent.futures
 import pygame
 import sys
 import time
 
 import tictactoe as ttt
 
+# Board size and winning line length can be given on the command line
+if len(sys.argv) not in (1, 3, 4):
+    sys.exit("Usage: python runner.py [rows columns [length]]")
+rows = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+columns = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+if len(sys.argv) > 3:
+    ttt.win_length = int(sys.argv[3])
+
 pygame.init()
 size = width, height = 600, 400
 
 # Colors
 black = (0, 0, 0)
 white = (255, 255, 255)
+gray = (128, 128, 128)
 
 screen = pygame.display.set_mode(size)
 
+smallFont = pygame.font.Font("OpenSans-Regular.ttf", 14)
 mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
 moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
+# Seconds the computer seems to think at least, so its moves can be followed
+AI_DELAY = 0.5
+
+# Frames per second the window is redrawn at
+FPS = 60
+
+# The AI thinks in a background thread, so the window keeps being drawn
+executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+
+def think(board):
+    """Runs minimax in the worker thread, clearing any earlier stop request."""
+    ttt.stop_search.clear()
+    return ttt.minimax(board)
+
+
+def cancel(future):
+    """Abandons the AI move being computed by `future`, if any."""
+    if future is not None:
+        future.cancel()
+        ttt.stop_search.set()
+
+
 user = None
-board = ttt.initial_state()
-ai_turn = False
+board = ttt.initial_state(rows, columns)
+
+# Future of the AI move being computed, and when it was asked for
+ai_move = None
+ai_started = None
+
+# Milliseconds spent on each of the latest frames, without the wait for the next one
+clock = pygame.time.Clock()
+frame_times = collections.deque(maxlen=FPS)
 
 while True:
+    frame_start = time.perf_counter()
 
+    # Position of this frame's left click, if any
+    click = None
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            cancel(ai_move)
+            executor.shutdown(wait=False)
             sys.exit()
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            click = event.pos
 
     screen.fill(black)
 
@@ -54,26 +103,22 @@ while True:
         screen.blit(playO, playORect)
 
         # Check if button is clicked
-        click, _, _ = pygame.mouse.get_pressed()
-        if click == 1:
-            mouse = pygame.mouse.get_pos()
-            if playXButton.collidepoint(mouse):
-                time.sleep(0.2)
+        if click is not None:
+            if playXButton.collidepoint(click):
                 user = ttt.X
-            elif playOButton.collidepoint(mouse):
-                time.sleep(0.2)
+            elif playOButton.collidepoint(click):
                 user = ttt.O
 
     else:
 
         # Draw game board
-        tile_size = 80
-        tile_origin = (width / 2 - (1.5 * tile_size),
-                       height / 2 - (1.5 * tile_size))
+        tile_size = min(80, (height - 140) // rows, (width - 40) // columns)
+        tile_origin = (width / 2 - (columns / 2 * tile_size),
+                       height / 2 - (rows / 2 * tile_size))
         tiles = []
-        for i in range(3):
+        for i in range(rows):
             row = []
-            for j in range(3):
+            for j in range(columns):
                 rect = pygame.Rect(
                     tile_origin[0] + j * tile_size,
                     tile_origin[1] + i * tile_size,
@@ -102,29 +147,26 @@ while True:
         elif user == player:
             title = f"Play as {user}"
         else:
-            title = f"Computer thinking..."
+            title = "Computer thinking" + "." * (int(time.perf_counter() * 2) % 3 + 1)
         title = largeFont.render(title, True, white)
         titleRect = title.get_rect()
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Check for AI move, without waiting for it
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if ai_move is None:
+                ai_move = executor.submit(think, board)
+                ai_started = time.perf_counter()
+            elif ai_move.done() and time.perf_counter() - ai_started >= AI_DELAY:
+                board = ttt.result(board, ai_move.result())
+                ai_move = None
 
         # Check for a user move
-        click, _, _ = pygame.mouse.get_pressed()
-        if click == 1 and user == player and not game_over:
-            mouse = pygame.mouse.get_pos()
-            for i in range(3):
-                for j in range(3):
-                    if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
+        if click is not None and user == player and not game_over:
+            for i in range(rows):
+                for j in range(columns):
+                    if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(click)):
                         board = ttt.result(board, (i, j))
 
         if game_over:
@@ -134,13 +176,17 @@ while True:
             againRect.center = againButton.center
             pygame.draw.rect(screen, white, againButton)
             screen.blit(again, againRect)
-            click, _, _ = pygame.mouse.get_pressed()
-            if click == 1:
-                mouse = pygame.mouse.get_pos()
-                if againButton.collidepoint(mouse):
-                    time.sleep(0.2)
-                    user = None
-                    board = ttt.initial_state()
-                    ai_turn = False
+            if click is not None and againButton.collidepoint(click):
+                user = None
+                board = ttt.initial_state(rows, columns)
+
+    # Show how long the latest frames took to draw
+    if frame_times:
+        metric = smallFont.render(
+            f"frame {frame_times[-1]:.1f}ms, worst {max(frame_times):.1f}ms", True, gray
+        )
+        screen.blit(metric, (8, height - 22))
 
     pygame.display.flip()
+    frame_times.append((time.perf_counter() - frame_start) * 1000)
+    clock.tick(FPS)
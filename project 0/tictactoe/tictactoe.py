@@ -2,26 +2,103 @@
 Tic Tac Toe Player
 """
 
+import functools
 import math
-import copy
+import threading
+
+import bitboard
+import openingbook
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Marks in a row needed to win; None means the shorter side of the board
+win_length = None
+
+# Seconds the AI may think per move on boards larger than 3x3, which
+# are too big to solve; the 3x3 board is always solved exactly
+time_budget = 1.0
+
+# Kinds of values stored in the transposition table: alpha-beta search
+# only proves a value exactly when it falls strictly inside the window
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+# Maps canonical board keys to the (value, kind) found by searching them,
+# shared by every search and every game
+transpositions = {}
+
+# Counts of transposition table lookups that were answered or not
+cache_stats = {"hits": 0, "misses": 0}
+
+# Set to False to search without the transposition table
+use_cache = True
+
+# Positions visited by max_value and min_value
+search_stats = {"nodes": 0}
+
+# Search used by minimax: "bitboard" or "classic" (on list-of-lists boards,
+# always searching to the end of the game, so only fit for small boards)
+engine = "bitboard"
+
+# Set to False to always search, even on the 3x3 board
+use_book = True
+
+# The opening book of the 3x3 board, read from disk on first use
+book = None
+
+# Set from another thread to make a running bitboard search give up early,
+# returning its best move so far; cleared by whoever starts the next search
+stop_search = threading.Event()
+
 
 class OutOfBoundsError(Exception):
     """Personalizated exception for players out of bound"""
     pass
 
 
-def initial_state():
+def initial_state(rows=3, columns=3):
     """
     Returns starting state of the board.
     """
-    return [[EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY]]
+    return [[EMPTY] * columns for _ in range(rows)]
+
+
+def line_length(board):
+    """
+    Returns how many marks in a row win on the board.
+    """
+    return win_length or min(len(board), len(board[0]))
+
+
+@functools.lru_cache(maxsize=None)
+def symmetries(rows, columns):
+    """
+    Returns the cell positions (i * columns + j) of a board under each of
+    its symmetries: 8 for square boards, 4 for the others.
+    """
+    def cell(i, j):
+        return i * columns + j
+
+    maps = [
+        lambda i, j: cell(i, j),
+        lambda i, j: cell(rows - 1 - i, columns - 1 - j),
+        lambda i, j: cell(i, columns - 1 - j),
+        lambda i, j: cell(rows - 1 - i, j)
+    ]
+    if rows == columns:
+        maps += [
+            lambda i, j: cell(j, i),
+            lambda i, j: cell(columns - 1 - j, rows - 1 - i),
+            lambda i, j: cell(rows - 1 - j, i),
+            lambda i, j: cell(j, columns - 1 - i)
+        ]
+    return [
+        tuple(transform(i, j) for i in range(rows) for j in range(columns))
+        for transform in maps
+    ]
 
 
 def total_filled_cells(board):
@@ -59,8 +136,8 @@ def actions(board):
     """
     set_of_actions = set()
 
-    for i in range(3):
-        for j in range(3):
+    for i in range(len(board)):
+        for j in range(len(board[0])):
             if board[i][j] is None:
                 action = (i, j)
                 set_of_actions.add(action)
@@ -72,7 +149,7 @@ def result(board, action):
     """
     Returns the board that results from making move (i, j) on the board.
     """
-    new_board = copy.deepcopy(board)
+    new_board = [row[:] for row in board]
 
     if action[0] < 0 or action[0] >= len(board) or action[1] < 0 or action[1] >= len(board[0]):
         raise OutOfBoundsError("This position isn't available.")
@@ -86,35 +163,15 @@ def result(board, action):
     return new_board
 
 
-def check_player_win_by_row(board, player):
-    for i in board:
-        if i == [player, player, player]:
-            return True
-    return False
-        
-
-def check_player_win_by_collunms(board, player):
-    for j in range(3):
-        if board[0][j] == board[1][j] == board[2][j] == player:
-            return True
-    return False
-
-
-def check_player_win_by_diagonals(board, player):
-    if board[0][0] == board[1][1] == board[2][2] == player:
-        return True
-    if board[0][2] == board[1][1] == board[2][0] == player:
-        return True
-    return False
-
-
 def winner(board):
     """
     Returns the winner of the game, if there is one.
     """
-    if check_player_win_by_row(board, X) or check_player_win_by_collunms(board, X) or check_player_win_by_diagonals(board, X):
+    masks = bitboard.win_masks(len(board), len(board[0]), line_length(board))
+    x, o = bitboard.to_bits(board)
+    if bitboard.has_won(x, masks):
         return X
-    elif check_player_win_by_row(board, O) or check_player_win_by_collunms(board, O) or check_player_win_by_diagonals(board, O):
+    elif bitboard.has_won(o, masks):
         return O
     else:
         return None
@@ -124,7 +181,7 @@ def terminal(board):
     """
     Returns True if game is over, False otherwise.
     """
-    if winner(board) is not None or total_filled_cells(board) == 9:
+    if winner(board) is not None or total_filled_cells(board) == len(board) * len(board[0]):
         return True
     else:
         return False
@@ -134,27 +191,87 @@ def utility(board):
     """
     Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
     """
-    if winner(board) == X:
+    given_winner = winner(board)
+    if given_winner == X:
         return 1
-    elif winner(board) == O:
+    elif given_winner == O:
         return -1
     else:
         return 0
 
 
+def canonical_key(board):
+    """
+    Returns the same key for a board and all of its rotations and
+    reflections: its shape and winning line length, as boards played by
+    other rules share the table, and the smallest of their cell strings.
+    """
+    cells = "".join(cell or "-" for row in board for cell in row)
+    return (len(board), len(board[0]), line_length(board), min(
+        "".join(cells[i] for i in symmetry)
+        for symmetry in symmetries(len(board), len(board[0]))
+    ))
+
+
+def cached_value(key, alpha, beta):
+    """
+    Returns the stored value of a board if it decides the search
+    in the (alpha, beta) window, None otherwise.
+    """
+    entry = transpositions.get(key)
+    if entry is not None:
+        value, kind = entry
+        if (kind == EXACT
+                or (kind == LOWER_BOUND and value >= beta)
+                or (kind == UPPER_BOUND and value <= alpha)):
+            cache_stats["hits"] += 1
+            return value
+    cache_stats["misses"] += 1
+    return None
+
+
+def store_value(key, value, alpha, beta):
+    """Stores a searched value along with how much the window proves."""
+    if value <= alpha:
+        kind = UPPER_BOUND
+    elif value >= beta:
+        kind = LOWER_BOUND
+    else:
+        kind = EXACT
+    transpositions[key] = (value, kind)
+
+
+def clear_cache():
+    """Empties the transposition table and its counters."""
+    transpositions.clear()
+    cache_stats["hits"] = 0
+    cache_stats["misses"] = 0
+
+
 def max_value(board, alpha=float('-inf'), beta=float('inf')):
     """
     Returns the max value, dealing with future values of the opponent
     """
+    search_stats["nodes"] += 1
     if terminal(board):
         return utility(board)
 
+    if use_cache:
+        key = canonical_key(board)
+        cached = cached_value(key, alpha, beta)
+        if cached is not None:
+            return cached
+    window = (alpha, beta)
+
     value = float('-inf')
     for action in actions(board):
         value = max(value, min_value(result(board, action), alpha, beta))
         if value >= beta:
-            return value  
+            break
         alpha = max(alpha, value)
+
+    if use_cache:
+        store_value(key, value, *window)
     return value
 
 
@@ -162,15 +279,26 @@ def min_value(board, alpha=float('-inf'), beta=float('inf')):
     """
     Returns the max value, dealing with future values of the opponent
     """
+    search_stats["nodes"] += 1
     if terminal(board):
         return utility(board)
 
+    if use_cache:
+        key = canonical_key(board)
+        cached = cached_value(key, alpha, beta)
+        if cached is not None:
+            return cached
+    window = (alpha, beta)
+
     value = float('inf')
     for action in actions(board):
         value = min(value, max_value(result(board, action), alpha, beta))
         if value <= alpha:
-            return value
+            break
         beta = min(beta, value)
+
+    if use_cache:
+        store_value(key, value, *window)
     return value
 
 
@@ -181,6 +309,22 @@ def minimax(board):
     if terminal(board):
         return None
 
+    # Every reachable 3x3 position is answered by the opening book
+    if use_book and len(board) == 3 and len(board[0]) == 3 and line_length(board) == 3:
+        global book
+        if book is None:
+            book = openingbook.load_book()
+        entry = openingbook.lookup(book, board)
+        if entry is not None:
+            return entry[0]
+
+    if engine == "bitboard":
+        cells = len(board) * len(board[0])
+        return bitboard.best_move(
+            board, line_length(board), time_budget if cells > 9 else None,
+            stop=stop_search
+        )
+
     if player(board) == "X":
         best_value = -2
         best_action = None
@@ -0,0 +1,162 @@
+"""
+Times every model checking method of logic.py on puzzles from generate.py,
+asking whether each symbol is entailed, one query at a time and all in one
+batch, and checks that all methods agree.
+
+Methods that enumerate models are only timed while puzzles have at most
+as many symbols as their entry in MAX_SYMBOLS, as they try every one of
+their 2^n models.
+
+Results are printed as text, or written as CSV or JSON with one record per
+puzzle, method and mode, so runs can be compared. The text report also
+times one evaluation of puzzle 3's knowledge base in every model, through
+the Sentence objects and compiled. Exits with status 1 if methods disagree.
+
+Usage: python benchmark.py [--speakers N ...] [--depth D] [--seed S] [--unique] [--repeats R]
+       [--methods METHOD ...] [--format text|csv|json] [--output FILE]
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import random
+import sys
+import time
+
+import puzzle
+from generate import generate_puzzle
+from logic import *
+
+MAX_SYMBOLS = {"enumerate": 12, "partial": 24, "compiled": 16, "bitset": 24}
+
+FIELDS = ["speakers", "symbols", "depth", "seed", "unique", "method", "mode",
+          "seconds", "entailed", "agree"]
+
+
+def evaluation_seconds(repeats=200):
+    """
+    Returns the seconds Sentence.evaluate and a compiled function take
+    to evaluate puzzle 3's knowledge base in each of its models.
+    """
+    knowledge = puzzle.knowledge3
+    symbols = sorted(knowledge.symbols())
+    models = list(itertools.product((True, False), repeat=len(symbols)))
+    dictionaries = [dict(zip(symbols, model)) for model in models]
+    compiled = compile_sentence(knowledge, {symbol: i for i, symbol in enumerate(symbols)})
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for model in dictionaries:
+            knowledge.evaluate(model)
+    evaluated = (time.perf_counter() - start) / (repeats * len(models))
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for model in models:
+            compiled(model)
+    return evaluated, (time.perf_counter() - start) / (repeats * len(models))
+
+
+def best_of(repeats, function):
+    """Returns (result, seconds) of the fastest of `repeats` calls to `function`."""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        seconds = time.perf_counter() - start
+        if best is None or seconds < best[1]:
+            best = (result, seconds)
+    return best
+
+
+def benchmark_puzzle(speakers, depth, seed, unique, methods, repeats):
+    """Returns the records of every method and mode on one generated puzzle."""
+    symbols, knowledge, _ = generate_puzzle(speakers, depth, random.Random(seed), unique)
+    records = []
+    answers = []
+    for method in methods:
+        if len(symbols) > MAX_SYMBOLS.get(method, len(symbols)):
+            continue
+        modes = {
+            "single": lambda: [model_check(knowledge, symbol, method) for symbol in symbols],
+            "batch": lambda: model_check_all(knowledge, symbols, method)
+        }
+        for mode, run in modes.items():
+            entailed, seconds = best_of(repeats, run)
+            answers.append(entailed)
+            records.append({
+                "speakers": speakers,
+                "symbols": len(symbols),
+                "depth": depth,
+                "seed": seed,
+                "unique": unique,
+                "method": method,
+                "mode": mode,
+                "seconds": seconds,
+                "entailed": sum(entailed)
+            })
+
+    # Every method and mode must find the same entailed symbols
+    agree = all(entailed == answers[0] for entailed in answers)
+    for record in records:
+        record["agree"] = agree
+    return records
+
+
+def write_report(records, form, output):
+    if form == "json":
+        json.dump(records, output, indent=2)
+        output.write("\n")
+    elif form == "csv":
+        writer = csv.DictWriter(output, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(records)
+    else:
+        for record in records:
+            output.write(
+                f"{record['speakers']} speakers ({record['symbols']} symbols), "
+                f"{record['method']} {record['mode']}: {record['seconds'] * 1000:.1f}ms, "
+                f"{record['entailed']} entailed"
+                + ("" if record["agree"] else ", DISAGREES") + "\n"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--speakers", type=int, nargs="+", default=[2, 3, 4, 6, 8, 12, 20, 40],
+                        help="numbers of speakers of the puzzles")
+    parser.add_argument("--depth", type=int, default=1,
+                        help="nesting depth of the statements")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--unique", action="store_true",
+                        help="only use puzzles with a unique solution")
+    parser.add_argument("--repeats", type=int, default=1,
+                        help="runs of each method, the fastest being reported")
+    parser.add_argument("--methods", nargs="+", choices=list(METHODS), default=list(METHODS))
+    parser.add_argument("--format", dest="form", choices=["text", "csv", "json"],
+                        default="text")
+    parser.add_argument("--output", type=argparse.FileType("w", encoding="utf-8"),
+                        default=sys.stdout)
+    args = parser.parse_args()
+
+    if args.form == "text":
+        evaluated, compiled = evaluation_seconds()
+        args.output.write(
+            f"Puzzle 3 knowledge, per model: evaluate {evaluated * 1e6:.2f}us, "
+            f"compiled {compiled * 1e6:.2f}us ({evaluated / compiled:.1f}x)\n"
+        )
+
+    records = []
+    for speakers in args.speakers:
+        records.extend(benchmark_puzzle(
+            speakers, args.depth, args.seed, args.unique, args.methods, args.repeats
+        ))
+    write_report(records, args.form, args.output)
+
+    if not all(record["agree"] for record in records):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
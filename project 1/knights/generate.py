@@ -0,0 +1,106 @@
+"""
+Random knights and knaves puzzles.
+
+Every speaker is either a knight, who only tells the truth, or a knave, who
+only lies, and makes one statement about the others. A statement is a claim
+that someone is a knight or a knave, or, while `depth` allows, a negation,
+conjunction, disjunction or implication of statements, or a claim that
+someone else says a statement.
+
+Puzzles can be required to have a unique solution, as real ones do: many
+random puzzles are paradoxes, entailing everything, or leave some
+speakers undetermined.
+
+Usage: python generate.py [speakers] [depth] [seed]
+"""
+
+import random
+import sys
+
+from logic import *
+
+# Puzzles generated at most while looking for one with a unique solution
+MAX_ATTEMPTS = 1000
+
+
+def generate_puzzle(speakers, depth=1, rng=random, unique=False):
+    """
+    Returns (symbols, knowledge, statements) for a puzzle with `speakers`
+    people: their "is a Knight" and "is a Knave" symbols, the knowledge base
+    of the puzzle, and the sentence each of them says.
+
+    With `unique`, only returns a puzzle that determines every speaker,
+    raising ValueError if none is found within MAX_ATTEMPTS.
+    """
+    for _ in range(MAX_ATTEMPTS):
+        symbols, knowledge, statements = random_puzzle(speakers, depth, rng)
+        if not unique or is_unique(symbols, knowledge):
+            return symbols, knowledge, statements
+    raise ValueError(f"no puzzle with a unique solution found in {MAX_ATTEMPTS} attempts")
+
+
+def is_unique(symbols, knowledge):
+    """
+    Returns True if knowledge base entails, for every speaker, exactly one
+    of their symbols, given knights first and knaves in the same order.
+    """
+    entailed = model_check_all(knowledge, symbols, "sat")
+    speakers = len(symbols) // 2
+    return all(entailed[i] != entailed[speakers + i] for i in range(speakers))
+
+
+def random_puzzle(speakers, depth, rng):
+    """Returns (symbols, knowledge, statements) for any random puzzle."""
+    knights = [Symbol(f"{i} is a Knight") for i in range(speakers)]
+    knaves = [Symbol(f"{i} is a Knave") for i in range(speakers)]
+
+    def statement(depth):
+        person = rng.randrange(speakers)
+        kind = rng.randrange(7) if depth > 0 else rng.randrange(2)
+        if kind == 0:
+            return knights[person]
+        elif kind == 1:
+            return knaves[person]
+        elif kind == 2:
+            return Not(statement(depth - 1))
+        elif kind == 3:
+            return And(statement(depth - 1), statement(depth - 1))
+        elif kind == 4:
+            return Or(statement(depth - 1), statement(depth - 1))
+        elif kind == 5:
+            return Implication(statement(depth - 1), statement(depth - 1))
+        else:
+
+            # What someone says is true exactly when they are a knight
+            return Biconditional(knights[person], statement(depth - 1))
+
+    knowledge = And()
+    statements = []
+    for i in range(speakers):
+        said = statement(depth)
+        statements.append(said)
+        knowledge.add(Biconditional(knights[i], Not(knaves[i])))
+        knowledge.add(Biconditional(knights[i], said))
+    return knights + knaves, knowledge, statements
+
+
+def main():
+    if len(sys.argv) > 4:
+        sys.exit("Usage: python generate.py [speakers] [depth] [seed]")
+    speakers = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    depth = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else None
+
+    symbols, knowledge, statements = generate_puzzle(
+        speakers, depth, random.Random(seed), unique=True
+    )
+    for i, said in enumerate(statements):
+        print(f"{i} says {said.formula()}")
+    print("Solution")
+    for symbol, entailed in zip(symbols, model_check_all(knowledge, symbols, "sat")):
+        if entailed:
+            print(f"    {symbol}")
+
+
+if __name__ == "__main__":
+    main()
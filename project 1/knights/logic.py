@@ -1,12 +1,44 @@
+import functools
 import itertools
+import weakref
+
+import sat
+
+# Symbols whose models are evaluated together by bitset_check: 2^16 models,
+# in 8KB integers
+CHUNK_SYMBOLS = 16
 
 
 class Sentence():
 
+    # Every Symbol, Not, Implication and Biconditional alive, by class and
+    # name or operands, so building a sentence that already exists returns
+    # that one. And and Or can grow through add, so they aren't shared.
+    interned = weakref.WeakValueDictionary()
+
+    __slots__ = ("__weakref__",)
+
+    def __reduce__(self):
+        # Pickled and copied as the arguments it was built from, so it is
+        # interned again and rehashed when loaded
+        return (type(self), self.parts())
+
+    def parts(self):
+        """Returns the arguments the sentence was built from."""
+        return ()
+
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
 
+    def evaluate_partial(self, model):
+        """
+        Evaluates the logical sentence in a model that may leave symbols
+        unassigned: returns True or False if every completion of the model
+        agrees on the value, None if it can't tell.
+        """
+        raise Exception("nothing to evaluate")
+
     def formula(self):
         """Returns string formula representing logical sentence."""
         return ""
@@ -15,6 +47,47 @@ class Sentence():
         """Returns a set of all symbols in the logical sentence."""
         return set()
 
+    def symbol_set(self):
+        """
+        Returns a frozenset of all symbols in the logical sentence,
+        which the sentence classes below compute once and share.
+        """
+        return frozenset(self.symbols())
+
+    def encode(self, cnf):
+        """Adds the clauses defining the sentence to a CNF, returning its literal."""
+        raise Exception("nothing to encode")
+
+    def expression(self, index):
+        """
+        Returns Python source evaluating the sentence in a model `m`, a
+        sequence of booleans where symbol `name` is at `index[name]`.
+        """
+        raise Exception("nothing to compile")
+
+    def bit_expression(self, index):
+        """
+        Returns Python source evaluating the sentence in many models at
+        once: bit k of the integer `m[index[name]]` is the value of symbol
+        `name` in model k, and bit k of the result the sentence's value.
+        Bits past the last model are meaningless and must be masked off.
+        """
+        raise Exception("nothing to compile")
+
+    @classmethod
+    def interned_instance(cls, key):
+        """
+        Returns the sentence of this class interned under `key` and False,
+        or a new, uninitialized one interned under it and True.
+        """
+        key = (cls,) + key
+        sentence = Sentence.interned.get(key)
+        if sentence is not None:
+            return sentence, False
+        sentence = object.__new__(cls)
+        Sentence.interned[key] = sentence
+        return sentence, True
+
     @classmethod
     def validate(cls, sentence):
         if not isinstance(sentence, Sentence):
@@ -43,15 +116,21 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = ("name", "_hash", "_symbols")
 
-    def __init__(self, name):
-        self.name = name
+    def __new__(cls, name):
+        symbol, new = cls.interned_instance((name,))
+        if new:
+            symbol.name = name
+            symbol._hash = hash(("symbol", name))
+            symbol._symbols = frozenset((name,))
+        return symbol
 
     def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+        return self is other or (isinstance(other, Symbol) and self.name == other.name)
 
     def __hash__(self):
-        return hash(("symbol", self.name))
+        return self._hash
 
     def __repr__(self):
         return self.name
@@ -62,23 +141,52 @@ class Symbol(Sentence):
         except KeyError:
             raise Exception(f"variable {self.name} not in model")
 
+    def evaluate_partial(self, model):
+        value = model.get(self.name)
+        return None if value is None else bool(value)
+
     def formula(self):
         return self.name
 
+    def parts(self):
+        return (self.name,)
+
     def symbols(self):
         return {self.name}
 
+    def symbol_set(self):
+        return self._symbols
+
+    def encode(self, cnf):
+        return cnf.variable(self.name)
+
+    def expression(self, index):
+        try:
+            return f"m[{index[self.name]}]"
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
+
+    def bit_expression(self, index):
+        return self.expression(index)
+
 
 class Not(Sentence):
-    def __init__(self, operand):
+    __slots__ = ("operand", "_hash", "_symbols")
+
+    def __new__(cls, operand):
         Sentence.validate(operand)
-        self.operand = operand
+        sentence, new = cls.interned_instance((id(operand),))
+        if new:
+            sentence.operand = operand
+            sentence._hash = hash(("not", hash(operand)))
+            sentence._symbols = None
+        return sentence
 
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        return self is other or (isinstance(other, Not) and self.operand == other.operand)
 
     def __hash__(self):
-        return hash(("not", hash(self.operand)))
+        return self._hash
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -86,26 +194,53 @@ class Not(Sentence):
     def evaluate(self, model):
         return not self.operand.evaluate(model)
 
+    def evaluate_partial(self, model):
+        value = self.operand.evaluate_partial(model)
+        return None if value is None else not value
+
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
+    def parts(self):
+        return (self.operand,)
+
     def symbols(self):
-        return self.operand.symbols()
+        return set(self.symbol_set())
+
+    def symbol_set(self):
+        if self._symbols is None:
+            self._symbols = self.operand.symbol_set()
+        return self._symbols
+
+    def encode(self, cnf):
+        return -cnf.literal(self.operand)
+
+    def expression(self, index):
+        return f"(not {self.operand.expression(index)})"
+
+    def bit_expression(self, index):
+        return f"(~{self.operand.bit_expression(index)})"
 
 
 class And(Sentence):
+    __slots__ = ("conjuncts", "_hash", "_symbols")
+
     def __init__(self, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
         self.conjuncts = list(conjuncts)
+        self._hash = None
+        self._symbols = None
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return self is other or (isinstance(other, And) and self.conjuncts == other.conjuncts)
 
     def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+        if self._hash is None:
+            self._hash = hash(
+                ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
+            )
+        return self._hash
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -114,35 +249,88 @@ class And(Sentence):
         return f"And({conjunctions})"
 
     def add(self, conjunct):
+        """
+        Adds a conjunct. Sentences already built from this one keep the
+        hash and symbols they cached, so add conjuncts before using it
+        in another sentence.
+        """
         Sentence.validate(conjunct)
         self.conjuncts.append(conjunct)
+        self._hash = None
+        self._symbols = None
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
 
+    def evaluate_partial(self, model):
+        result = True
+        for conjunct in self.conjuncts:
+            value = conjunct.evaluate_partial(model)
+            if value is False:
+                return False
+            elif value is None:
+                result = None
+        return result
+
     def formula(self):
         if len(self.conjuncts) == 1:
             return self.conjuncts[0].formula()
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
+    def parts(self):
+        return tuple(self.conjuncts)
+
     def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+        return set(self.symbol_set())
+
+    def symbol_set(self):
+        if self._symbols is None:
+            self._symbols = frozenset().union(*[conjunct.symbol_set() for conjunct in self.conjuncts])
+        return self._symbols
+
+    def encode(self, cnf):
+        literals = [cnf.literal(conjunct) for conjunct in self.conjuncts]
+        x = cnf.new_variable()
+        for literal in literals:
+            cnf.clauses.append([-x, literal])
+        cnf.clauses.append([x] + [-literal for literal in literals])
+        return x
+
+    def expression(self, index):
+        if not self.conjuncts:
+            return "True"
+        return "(" + " and ".join(
+            conjunct.expression(index) for conjunct in self.conjuncts
+        ) + ")"
+
+    def bit_expression(self, index):
+        if not self.conjuncts:
+            return "-1"
+        return "(" + " & ".join(
+            conjunct.bit_expression(index) for conjunct in self.conjuncts
+        ) + ")"
 
 
 class Or(Sentence):
+    __slots__ = ("disjuncts", "_hash", "_symbols")
+
     def __init__(self, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
         self.disjuncts = list(disjuncts)
+        self._hash = None
+        self._symbols = None
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        return self is other or (isinstance(other, Or) and self.disjuncts == other.disjuncts)
 
     def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+        if self._hash is None:
+            self._hash = hash(
+                ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
+            )
+        return self._hash
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
@@ -151,30 +339,77 @@ class Or(Sentence):
     def evaluate(self, model):
         return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
 
+    def evaluate_partial(self, model):
+        result = False
+        for disjunct in self.disjuncts:
+            value = disjunct.evaluate_partial(model)
+            if value is True:
+                return True
+            elif value is None:
+                result = None
+        return result
+
     def formula(self):
         if len(self.disjuncts) == 1:
             return self.disjuncts[0].formula()
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
+    def parts(self):
+        return tuple(self.disjuncts)
+
     def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+        return set(self.symbol_set())
+
+    def symbol_set(self):
+        if self._symbols is None:
+            self._symbols = frozenset().union(*[disjunct.symbol_set() for disjunct in self.disjuncts])
+        return self._symbols
+
+    def encode(self, cnf):
+        literals = [cnf.literal(disjunct) for disjunct in self.disjuncts]
+        x = cnf.new_variable()
+        for literal in literals:
+            cnf.clauses.append([x, -literal])
+        cnf.clauses.append([-x] + literals)
+        return x
+
+    def expression(self, index):
+        if not self.disjuncts:
+            return "False"
+        return "(" + " or ".join(
+            disjunct.expression(index) for disjunct in self.disjuncts
+        ) + ")"
+
+    def bit_expression(self, index):
+        if not self.disjuncts:
+            return "0"
+        return "(" + " | ".join(
+            disjunct.bit_expression(index) for disjunct in self.disjuncts
+        ) + ")"
 
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
+    __slots__ = ("antecedent", "consequent", "_hash", "_symbols")
+
+    def __new__(cls, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
+        sentence, new = cls.interned_instance((id(antecedent), id(consequent)))
+        if new:
+            sentence.antecedent = antecedent
+            sentence.consequent = consequent
+            sentence._hash = hash(("implies", hash(antecedent), hash(consequent)))
+            sentence._symbols = None
+        return sentence
 
     def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return self is other or (isinstance(other, Implication)
+                                 and self.antecedent == other.antecedent
+                                 and self.consequent == other.consequent)
 
     def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+        return self._hash
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -183,61 +418,261 @@ class Implication(Sentence):
         return ((not self.antecedent.evaluate(model))
                 or self.consequent.evaluate(model))
 
+    def evaluate_partial(self, model):
+        antecedent = self.antecedent.evaluate_partial(model)
+        if antecedent is False:
+            return True
+        consequent = self.consequent.evaluate_partial(model)
+        if consequent is True:
+            return True
+        if antecedent is True and consequent is False:
+            return False
+        return None
+
     def formula(self):
         antecedent = Sentence.parenthesize(self.antecedent.formula())
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
+    def parts(self):
+        return (self.antecedent, self.consequent)
+
     def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+        return set(self.symbol_set())
+
+    def symbol_set(self):
+        if self._symbols is None:
+            self._symbols = self.antecedent.symbol_set() | self.consequent.symbol_set()
+        return self._symbols
+
+    def encode(self, cnf):
+        antecedent = cnf.literal(self.antecedent)
+        consequent = cnf.literal(self.consequent)
+        x = cnf.new_variable()
+        cnf.clauses.append([x, antecedent])
+        cnf.clauses.append([x, -consequent])
+        cnf.clauses.append([-x, -antecedent, consequent])
+        return x
+
+    def expression(self, index):
+        antecedent = self.antecedent.expression(index)
+        consequent = self.consequent.expression(index)
+        return f"(not {antecedent} or {consequent})"
+
+    def bit_expression(self, index):
+        antecedent = self.antecedent.bit_expression(index)
+        consequent = self.consequent.bit_expression(index)
+        return f"(~{antecedent} | {consequent})"
 
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
+    __slots__ = ("left", "right", "_hash", "_symbols")
+
+    def __new__(cls, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
-        self.left = left
-        self.right = right
+        sentence, new = cls.interned_instance((id(left), id(right)))
+        if new:
+            sentence.left = left
+            sentence.right = right
+            sentence._hash = hash(("biconditional", hash(left), hash(right)))
+            sentence._symbols = None
+        return sentence
 
     def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return self is other or (isinstance(other, Biconditional)
+                                 and self.left == other.left
+                                 and self.right == other.right)
 
     def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+        return self._hash
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
 
     def evaluate(self, model):
-        return ((self.left.evaluate(model)
-                 and self.right.evaluate(model))
-                or (not self.left.evaluate(model)
-                    and not self.right.evaluate(model)))
+        return self.left.evaluate(model) == self.right.evaluate(model)
+
+    def evaluate_partial(self, model):
+        left = self.left.evaluate_partial(model)
+        if left is None:
+            return None
+        right = self.right.evaluate_partial(model)
+        return None if right is None else left == right
 
     def formula(self):
         left = Sentence.parenthesize(str(self.left))
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
+    def parts(self):
+        return (self.left, self.right)
+
     def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
+        return set(self.symbol_set())
+
+    def symbol_set(self):
+        if self._symbols is None:
+            self._symbols = self.left.symbol_set() | self.right.symbol_set()
+        return self._symbols
+
+    def encode(self, cnf):
+        left = cnf.literal(self.left)
+        right = cnf.literal(self.right)
+        x = cnf.new_variable()
+        cnf.clauses.append([-x, -left, right])
+        cnf.clauses.append([-x, left, -right])
+        cnf.clauses.append([x, left, right])
+        cnf.clauses.append([x, -left, -right])
+        return x
+
+    def expression(self, index):
+        # Both sides evaluate to booleans, so equality is equivalence
+        return f"({self.left.expression(index)} == {self.right.expression(index)})"
+
+    def bit_expression(self, index):
+        left = self.left.bit_expression(index)
+        right = self.right.bit_expression(index)
+        return f"(~({left} ^ {right}))"
+
+
+class CNF():
+    """
+    Clauses in the DIMACS form of sat.py that are satisfiable exactly when
+    the sentences added are, using the Tseitin encoding: each compound
+    subformula gets a new variable equivalent to it, so the clauses grow
+    linearly with the sentences instead of exponentially.
+    """
+
+    def __init__(self):
+        self.clauses = []
+
+        # Maps symbol names to their variables
+        self.variables = {}
+
+        # Maps each subformula encoded so far to its literal
+        self.literals = {}
+
+        self.count = 0
+
+    def new_variable(self):
+        self.count += 1
+        return self.count
+
+    def variable(self, name):
+        """Returns the variable of the symbol `name`."""
+        if name not in self.variables:
+            self.variables[name] = self.new_variable()
+        return self.variables[name]
+
+    def literal(self, sentence):
+        """Returns the literal equivalent to `sentence`, encoding it once."""
+        Sentence.validate(sentence)
+        if sentence not in self.literals:
+            self.literals[sentence] = sentence.encode(self)
+        return self.literals[sentence]
+
+    def add(self, sentence):
+        """Adds clauses asserting that `sentence` is true."""
+        self.clauses.append([self.literal(sentence)])
+
+
+def compile_sentence(sentence, index, bitwise=False):
+    """
+    Returns a function evaluating `sentence` in a model given as a
+    sequence of booleans, where symbol `name` is at `index[name]`, or
+    with `bitwise` in many models at once (see bit_expression).
+    """
+    Sentence.validate(sentence)
+    if bitwise:
+        return eval(f"lambda m: {sentence.bit_expression(index)}")
+    return eval(f"lambda m: {sentence.expression(index)}")
+
+
+@functools.lru_cache(maxsize=None)
+def bit_columns(count):
+    """
+    Returns the columns of `count` symbols over all 2^count models:
+    integers where bit k of column j is bit j of k.
+    """
+    size = 1 << count
+    columns = []
+    for j in range(count):
+        width = 1 << j
+        period = (1 << (2 * width)) - 1
+        columns.append((((1 << width) - 1) << width) * (((1 << size) - 1) // period))
+    return tuple(columns)
+
+
+def chunked_models(count):
+    """
+    Yields (mask, columns) covering all models of `count` symbols, with
+    at most 2^CHUNK_SYMBOLS models at a time so memory stays bounded.
+    The first symbols vary within each chunk, the rest across chunks.
+    """
+    inner = min(count, CHUNK_SYMBOLS)
+    mask = (1 << (1 << inner)) - 1
+    columns = bit_columns(inner)
+    for chunk in range(1 << (count - inner)):
+        yield mask, columns + tuple(
+            mask if chunk >> j & 1 else 0 for j in range(count - inner)
+        )
+
+
+def model_check(knowledge, query, method="partial"):
+    """
+    Checks if knowledge base entails query, using one of the METHODS:
+    "enumerate" evaluates both in every model of their symbols, "partial"
+    does the same but skips models once a partial assignment settles the
+    question, "compiled" evaluates every model with the sentences compiled
+    to Python functions, "bitset" evaluates them in thousands of models per
+    bitwise operation, and "sat" searches for a model of the knowledge base
+    where the query is false.
+    """
+    return model_check_all(knowledge, [query], method)[0]
+
+
+def model_check_all(knowledge, queries, method="partial"):
+    """
+    Returns whether knowledge base entails each of the queries, as a list
+    of booleans, going through the models of the knowledge base (or
+    solving it) once for all of them. See model_check for the METHODS.
+    """
+    try:
+        check = METHODS[method]
+    except KeyError:
+        raise ValueError(f"unknown model checking method {method}")
+    for query in queries:
+        Sentence.validate(query)
+    return check(knowledge, list(queries))
 
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+def all_symbols(knowledge, queries):
+    """Returns the symbols of the knowledge base and queries, sorted."""
+    return sorted(knowledge.symbol_set().union(*[query.symbol_set() for query in queries]))
 
-    def check_all(knowledge, query, symbols, model):
-        """Checks if knowledge base entails query, given a particular model."""
+
+def enumeration_check(knowledge, queries):
+    """Checks which queries knowledge base entails by enumerating every model."""
+
+    # Whether each query still holds in every model of the knowledge base
+    entailed = [True] * len(queries)
+
+    def check_all(knowledge, queries, symbols, model):
+        """Checks which queries knowledge base entails, given a particular model."""
+
+        # Stop once no query can be entailed anymore
+        if not any(entailed):
+            return
 
         # If model has an assignment for each symbol
         if not symbols:
 
-            # If knowledge base is true in model, then query must also be true
+            # If knowledge base is true in model, then queries must also be true
             if knowledge.evaluate(model):
-                return query.evaluate(model)
-            return True
+                for i, query in enumerate(queries):
+                    if entailed[i] and not query.evaluate(model):
+                        entailed[i] = False
         else:
 
             # Choose one of the remaining unused symbols
@@ -253,11 +688,136 @@ def model_check(knowledge, query):
             model_false[p] = False
 
             # Ensure entailment holds in both models
-            return (check_all(knowledge, query, remaining, model_true) and
-                    check_all(knowledge, query, remaining, model_false))
-
-    # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
-
-    # Check that knowledge entails query
-    return check_all(knowledge, query, symbols, dict())
+            check_all(knowledge, queries, remaining, model_true)
+            check_all(knowledge, queries, remaining, model_false)
+
+    # Get all symbols in both knowledge and queries
+    symbols = set(all_symbols(knowledge, queries))
+
+    # Check which queries knowledge entails
+    check_all(knowledge, queries, symbols, dict())
+    return entailed
+
+
+def partial_check(knowledge, queries):
+    """
+    Checks which queries knowledge base entails by assigning symbols one
+    at a time, depth first, to a single model. An assignment is abandoned
+    as soon as it makes the knowledge base false, or makes every query
+    still in doubt true, and a query is refuted as soon as an assignment
+    makes the knowledge base true and the query false.
+    """
+    symbols = all_symbols(knowledge, queries)
+    entailed = [True] * len(queries)
+    model = {}
+
+    # Assignments to try, as (symbols assigned, value of the last one,
+    # queries not yet known to hold under the assignment's parent)
+    stack = [(0, None, list(range(len(queries))))]
+    while stack and any(entailed):
+        depth, value, doubtful = stack.pop()
+
+        # Take back the assignments of the previous branch, then extend the parent's
+        for symbol in symbols[depth:len(model)]:
+            del model[symbol]
+        if depth:
+            model[symbols[depth - 1]] = value
+
+        known = knowledge.evaluate_partial(model)
+        if known is False:
+            continue
+
+        still = []
+        for i in doubtful:
+            if not entailed[i]:
+                continue
+            holds = queries[i].evaluate_partial(model)
+            if holds is True:
+                continue
+            if holds is False and known is True:
+                entailed[i] = False
+                continue
+            still.append(i)
+
+        if still and depth < len(symbols):
+            stack.append((depth + 1, False, still))
+            stack.append((depth + 1, True, still))
+    return entailed
+
+
+def compiled_check(knowledge, queries):
+    """
+    Checks which queries knowledge base entails by evaluating compiled
+    versions of them in every model.
+    """
+    symbols = all_symbols(knowledge, queries)
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+    knowledge = compile_sentence(knowledge, index)
+    queries = [compile_sentence(query, index) for query in queries]
+
+    pending = set(range(len(queries)))
+    for model in itertools.product((True, False), repeat=len(symbols)):
+        if not pending:
+            break
+        if knowledge(model):
+            pending = {i for i in pending if queries[i](model)}
+    return [i in pending for i in range(len(queries))]
+
+
+def bitset_check(knowledge, queries):
+    """
+    Checks which queries knowledge base entails by evaluating them in
+    whole chunks of models at once, each model a bit of an integer.
+    """
+    symbols = all_symbols(knowledge, queries)
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+    knowledge = compile_sentence(knowledge, index, bitwise=True)
+    queries = [compile_sentence(query, index, bitwise=True) for query in queries]
+
+    pending = set(range(len(queries)))
+    for mask, columns in chunked_models(len(symbols)):
+        if not pending:
+            break
+        models = knowledge(columns) & mask
+        if models:
+            pending = {i for i in pending if not models & ~queries[i](columns)}
+    return [i in pending for i in range(len(queries))]
+
+
+def sat_check(knowledge, queries):
+    """
+    Checks which queries knowledge base entails by proving, with one SAT
+    solver, that the knowledge base can't be true along with the negation
+    of each of them.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+
+    # Each query's literal is only defined, not asserted, by its clauses
+    literals = [cnf.literal(query) for query in queries]
+    solver = sat.Solver(cnf.clauses)
+    for literal in literals:
+        solver.add_variable(abs(literal))
+
+    entailed = [None] * len(queries)
+    for i, literal in enumerate(literals):
+        if entailed[i] is not None:
+            continue
+        if not solver.solve([-literal]):
+            entailed[i] = True
+            continue
+
+        # The model found is a counterexample to every query false in it
+        for j in range(i, len(literals)):
+            if entailed[j] is None and solver.model[abs(literals[j])] != (literals[j] > 0):
+                entailed[j] = False
+    return entailed
+
+
+METHODS = {
+    "enumerate": enumeration_check,
+    "partial": partial_check,
+    "compiled": compiled_check,
+    "bitset": bitset_check,
+    "sat": sat_check
+}
@@ -0,0 +1,293 @@
+"""
+A small CDCL SAT solver over clauses in DIMACS form: a clause is a list of
+non-zero integers, v standing for variable v being true and -v for it
+being false.
+
+The solver propagates units with two watched literals per clause, learns
+a first-UIP clause from every conflict and jumps back to where it becomes
+unit, branches on the most active variable (VSIDS) with saved phases, and
+restarts on a geometric schedule. Clauses learned under one set of
+assumptions stay valid for the next, so one solver can answer many
+questions about the same clauses.
+"""
+
+import heapq
+
+# Conflicts before the first restart, and how much the limit grows after each
+RESTART_FIRST = 100
+RESTART_GROWTH = 1.5
+
+# Activity bump growth per conflict, and the activity that triggers rescaling
+ACTIVITY_DECAY = 0.95
+ACTIVITY_LIMIT = 1e100
+
+
+class Solver():
+
+    def __init__(self, clauses=()):
+        # False once the clauses are known to be unsatisfiable
+        self.ok = True
+
+        # Maps each literal to the clauses watching it, visited when it turns false
+        self.watches = {}
+
+        # Literals currently true, in the order they were set
+        self.trail = []
+        self.true = set()
+
+        # Index in the trail where each decision level starts
+        self.levels = []
+
+        # Next trail position to propagate from
+        self.head = 0
+
+        # Decision level and implying clause of every assigned variable
+        self.level = {}
+        self.reason = {}
+
+        # Branching heuristic: activity of each variable, in a lazy max-heap,
+        # and the last value each variable had
+        self.activity = {}
+        self.heap = []
+        self.bump = 1.0
+        self.phase = {}
+
+        self.stats = {"decisions": 0, "conflicts": 0, "propagations": 0, "learned": 0}
+        self.model = None
+
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def add_variable(self, variable):
+        """Makes the solver aware of `variable` if it isn't already."""
+        if variable not in self.activity:
+            self.activity[variable] = 0.0
+            self.phase[variable] = False
+            self.watches[variable] = []
+            self.watches[-variable] = []
+            heapq.heappush(self.heap, (0.0, variable))
+
+    def value(self, literal):
+        """Returns True or False for an assigned literal, None otherwise."""
+        if literal in self.true:
+            return True
+        if -literal in self.true:
+            return False
+        return None
+
+    def add_clause(self, literals):
+        """
+        Adds a clause, returning False if the clauses have become unsatisfiable.
+        Clauses can only be added between calls to solve.
+        """
+        if not self.ok:
+            return False
+        self.backtrack(0)
+
+        clause = []
+        for literal in literals:
+            if literal == 0:
+                raise ValueError("0 is not a literal")
+            self.add_variable(abs(literal))
+            if -literal in clause or self.value(literal) is True:
+                return True
+            if literal not in clause and self.value(literal) is None:
+                clause.append(literal)
+
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self.assign(clause[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.watch(clause)
+        return self.ok
+
+    def watch(self, clause):
+        self.watches[clause[0]].append(clause)
+        self.watches[clause[1]].append(clause)
+
+    def assign(self, literal, reason):
+        variable = abs(literal)
+        self.trail.append(literal)
+        self.true.add(literal)
+        self.level[variable] = len(self.levels)
+        self.reason[variable] = reason
+
+    def propagate(self):
+        """
+        Sets every literal implied by the assignments made so far,
+        returning a clause made false if there is a conflict.
+        """
+        true = self.true
+        while self.head < len(self.trail):
+            false_literal = -self.trail[self.head]
+            self.head += 1
+            self.stats["propagations"] += 1
+
+            watching = self.watches[false_literal]
+            kept = []
+            for position, clause in enumerate(watching):
+
+                # Keep the false literal second
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], false_literal
+                if clause[0] in true:
+                    kept.append(clause)
+                    continue
+
+                # Watch another literal that isn't false, if there is one
+                for j in range(2, len(clause)):
+                    if -clause[j] not in true:
+                        clause[1], clause[j] = clause[j], false_literal
+                        self.watches[clause[1]].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if -clause[0] in true:
+                        kept.extend(watching[position + 1:])
+                        self.watches[false_literal] = kept
+                        return clause
+                    self.assign(clause[0], clause)
+            self.watches[false_literal] = kept
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns the first-UIP clause learned from a conflicting clause,
+        its asserting literal first, and the level to jump back to.
+        """
+        current = len(self.levels)
+        learned = [None]
+        seen = set()
+        pending = 0
+        position = len(self.trail) - 1
+        clause, pivot = conflict, None
+        while True:
+            for literal in clause:
+                variable = abs(literal)
+                if variable == pivot or variable in seen or self.level[variable] == 0:
+                    continue
+                seen.add(variable)
+                self.bump_activity(variable)
+                if self.level[variable] == current:
+                    pending += 1
+                else:
+                    learned.append(literal)
+
+            # Resolve on the latest assigned literal of this level in the clause
+            while abs(self.trail[position]) not in seen:
+                position -= 1
+            literal = self.trail[position]
+            position -= 1
+            pivot = abs(literal)
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.reason[pivot]
+
+        learned[0] = -literal
+        if len(learned) == 1:
+            return learned, 0
+
+        # Watch the literal of the highest level after the asserting one
+        deepest = max(range(1, len(learned)), key=lambda i: self.level[abs(learned[i])])
+        learned[1], learned[deepest] = learned[deepest], learned[1]
+        return learned, self.level[abs(learned[1])]
+
+    def bump_activity(self, variable):
+        activity = self.activity[variable] + self.bump
+        if activity > ACTIVITY_LIMIT:
+            for other in self.activity:
+                self.activity[other] /= ACTIVITY_LIMIT
+            self.bump /= ACTIVITY_LIMIT
+            self.heap = [(-self.activity[other], other) for other in self.activity]
+            heapq.heapify(self.heap)
+            activity = self.activity[variable]
+        self.activity[variable] = activity
+        heapq.heappush(self.heap, (-activity, variable))
+
+    def backtrack(self, level):
+        """Undoes every assignment made above decision `level`."""
+        if len(self.levels) <= level:
+            return
+        start = self.levels[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.true.discard(literal)
+            self.phase[variable] = literal > 0
+            del self.level[variable]
+            del self.reason[variable]
+            heapq.heappush(self.heap, (-self.activity[variable], variable))
+        del self.trail[start:]
+        del self.levels[level:]
+        self.head = start
+
+    def branch(self):
+        """Returns the unassigned variable with the highest activity, or None."""
+        while self.heap:
+            activity, variable = heapq.heappop(self.heap)
+            if variable not in self.level and -activity == self.activity[variable]:
+                return variable
+        return None
+
+    def solve(self, assumptions=()):
+        """
+        Returns True if the clauses, together with every literal in
+        `assumptions`, can be satisfied, storing a satisfying assignment
+        as a {variable: bool} dictionary in `model`.
+        """
+        self.model = None
+        if not self.ok:
+            return False
+        self.backtrack(0)
+        for literal in assumptions:
+            self.add_variable(abs(literal))
+
+        restart_limit = RESTART_FIRST
+        conflicts = 0
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.stats["conflicts"] += 1
+                conflicts += 1
+                if not self.levels:
+                    self.ok = False
+                    return False
+                learned, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.watch(learned)
+                    self.assign(learned[0], learned)
+                    self.stats["learned"] += 1
+                self.bump /= ACTIVITY_DECAY
+                continue
+
+            if conflicts >= restart_limit:
+                conflicts = 0
+                restart_limit *= RESTART_GROWTH
+                self.backtrack(0)
+                continue
+
+            # Decide the assumptions first, one level each
+            if len(self.levels) < len(assumptions):
+                literal = assumptions[len(self.levels)]
+                value = self.value(literal)
+                if value is False:
+                    self.backtrack(0)
+                    return False
+                self.levels.append(len(self.trail))
+                if value is None:
+                    self.assign(literal, None)
+                continue
+
+            variable = self.branch()
+            if variable is None:
+                self.model = {abs(literal): literal > 0 for literal in self.trail}
+                self.backtrack(0)
+                return True
+            self.stats["decisions"] += 1
+            self.levels.append(len(self.trail))
+            self.assign(variable if self.phase[variable] else -variable, None)
@@ -0,0 +1,82 @@
+"""
+Plays seeded Minesweeper games with the AI and reports how long each call
+to add_knowledge and each best guess take, and how large the knowledge
+base grows. The same games are also played guessing uniformly at random,
+to compare win rates.
+
+Usage: python benchmark.py [games] [height width mines] [seed]
+"""
+
+import random
+import statistics
+import sys
+import time
+
+from minesweeper import Minesweeper, MinesweeperAI
+
+
+def play(height, width, mines, seed, latencies=None, guess=True, guesses=None):
+    """
+    Plays one game, appending the seconds of every add_knowledge call to
+    `latencies` and of every best guess to `guesses`, or guessing at random
+    without `guess`. Returns (won, moves, largest knowledge base).
+    """
+    random.seed(seed)
+    game = Minesweeper(height=height, width=width, mines=mines)
+    ai = MinesweeperAI(height=height, width=width, mines=mines)
+    largest = 0
+    while len(ai.moves_made) < height * width - mines:
+        move = ai.make_safe_move()
+        if move is None and guess:
+            start = time.perf_counter()
+            move = ai.make_guess_move()
+            if guesses is not None:
+                guesses.append(time.perf_counter() - start)
+        elif move is None:
+            move = ai.make_random_move()
+        if move is None or game.is_mine(move):
+            return False, len(ai.moves_made), largest
+        nearby = game.nearby_mines(move)
+        start = time.perf_counter()
+        ai.add_knowledge(move, nearby)
+        if latencies is not None:
+            latencies.append(time.perf_counter() - start)
+        largest = max(largest, len(ai.knowledge))
+    return True, len(ai.moves_made), largest
+
+
+def main():
+    if len(sys.argv) not in (1, 2, 5, 6):
+        sys.exit("Usage: python benchmark.py [games] [height width mines] [seed]")
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    height, width, mines = (int(arg) for arg in sys.argv[2:5]) if len(sys.argv) > 4 else (16, 30, 99)
+    seed = int(sys.argv[5]) if len(sys.argv) > 5 else 0
+
+    latencies = []
+    guesses = []
+    wins = moves = largest = 0
+    start = time.perf_counter()
+    for game in range(games):
+        won, made, knowledge = play(height, width, mines, seed + game, latencies, True, guesses)
+        wins += won
+        moves += made
+        largest = max(largest, knowledge)
+    seconds = time.perf_counter() - start
+    random_wins = sum(
+        play(height, width, mines, seed + game, guess=False)[0] for game in range(games)
+    )
+
+    print(f"{games} games on {height}x{width} with {mines} mines: {wins} won, "
+          f"{moves} moves in {seconds:.2f}s ({random_wins} won guessing at random)")
+    for name, times in (("add_knowledge", latencies), ("make_guess_move", guesses)):
+        if times:
+            times.sort()
+            print(f"{name}: mean {statistics.mean(times) * 1000:.3f}ms, "
+                  f"median {times[len(times) // 2] * 1000:.3f}ms, "
+                  f"p99 {times[int(len(times) * 0.99)] * 1000:.3f}ms, "
+                  f"max {times[-1] * 1000:.3f}ms")
+    print(f"Largest knowledge base: {largest} sentences")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""
+Best guesses for the Minesweeper AI when no cell is known to be safe.
+
+The AI's sentences only involve the unknown cells next to revealed ones,
+the frontier. Sentences sharing cells are split into independent
+components, and the mine configurations consistent with each component are
+enumerated, or sampled when there are too many, counting them by number of
+mines. The components are then combined, weighting each choice of mines per
+component by the ways to place the remaining mines among the cells no
+sentence mentions, which gives every unknown cell's probability of being a
+mine.
+"""
+
+import math
+import random
+import time
+
+# Solutions past which a component is sampled instead of enumerated
+MAX_SOLUTIONS = 20000
+
+# Random solutions drawn from a component too large to enumerate
+SAMPLES = 500
+
+# Search nodes visited between two looks at the clock
+CLOCK_INTERVAL = 256
+
+
+class OutOfTime(Exception):
+    """Raised inside a search that has used its time budget."""
+    pass
+
+
+def components(sentences):
+    """
+    Splits (cells, count) constraints into groups sharing cells, returning
+    a list of (cells, constraints) with the cells in a good search order.
+    """
+    parent = {}
+
+    def find(cell):
+        while parent[cell] != cell:
+            parent[cell] = parent[parent[cell]]
+            cell = parent[cell]
+        return cell
+
+    for cells, count in sentences:
+        for cell in cells:
+            parent.setdefault(cell, cell)
+        first = next(iter(cells))
+        for cell in cells:
+            parent[find(cell)] = find(first)
+
+    groups = {}
+    for cells, count in sentences:
+        groups.setdefault(find(next(iter(cells))), []).append((cells, count))
+
+    result = []
+    for constraints in groups.values():
+
+        # Cells of a constraint next to each other, so constraints are
+        # settled as early as possible in the search, in an order that only
+        # depends on the constraints as counts are cached by position
+        order = []
+        seen = set()
+        canonical = sorted(
+            constraints,
+            key=lambda constraint: (len(constraint[0]), sorted(constraint[0]), constraint[1])
+        )
+        for cells, count in canonical:
+            for cell in sorted(cells - seen):
+                seen.add(cell)
+                order.append(cell)
+        result.append((tuple(order), constraints))
+    return result
+
+
+class Search():
+    """Backtracking over the mine configurations of one component."""
+
+    def __init__(self, cells, constraints, deadline, rng=None):
+        self.cells = cells
+        self.deadline = deadline
+        self.rng = rng
+        self.nodes = 0
+
+        # For each constraint: [count, mines assigned, cells unassigned]
+        self.constraints = [[count, 0, len(cells)] for cells, count in constraints]
+        self.touching = {cell: [] for cell in cells}
+        for i, (constraint_cells, count) in enumerate(constraints):
+            for cell in constraint_cells:
+                self.touching[cell].append(self.constraints[i])
+
+        self.mine = [False] * len(cells)
+
+    def fits(self, position, value):
+        """Assigns `value` to a cell if every constraint still can be met."""
+        cell = self.cells[position]
+        for constraint in self.touching[cell]:
+            count, mines, unassigned = constraint
+            if mines + value > count or mines + value + unassigned - 1 < count:
+                return False
+        for constraint in self.touching[cell]:
+            constraint[1] += value
+            constraint[2] -= 1
+        self.mine[position] = bool(value)
+        return True
+
+    def undo(self, position):
+        value = 1 if self.mine[position] else 0
+        for constraint in self.touching[self.cells[position]]:
+            constraint[1] -= value
+            constraint[2] += 1
+        self.mine[position] = False
+
+    def solutions(self, position=0):
+        """Yields the mine flags of every solution, once each, as a list."""
+        self.nodes += 1
+        if self.nodes % CLOCK_INTERVAL == 0 and time.perf_counter() > self.deadline:
+            raise OutOfTime()
+        if position == len(self.cells):
+            yield self.mine
+            return
+        values = (0, 1)
+        if self.rng is not None and self.rng.random() < 0.5:
+            values = (1, 0)
+        for value in values:
+            if self.fits(position, value):
+                yield from self.solutions(position + 1)
+                self.undo(position)
+
+
+def count_solutions(cells, constraints, deadline):
+    """
+    Returns ({mines: solutions}, {mines: [solutions with each cell a mine]})
+    for a component, or None if it has more than MAX_SOLUTIONS or time runs out.
+    """
+    counts = {}
+    cell_counts = {}
+    total = 0
+    try:
+        for mine in Search(cells, constraints, deadline).solutions():
+            total += 1
+            if total > MAX_SOLUTIONS:
+                return None
+            k = sum(mine)
+            counts[k] = counts.get(k, 0) + 1
+            row = cell_counts.setdefault(k, [0] * len(cells))
+            for position, is_mine in enumerate(mine):
+                if is_mine:
+                    row[position] += 1
+    except OutOfTime:
+        return None
+    return counts, cell_counts
+
+
+def sample_solutions(cells, constraints, deadline, rng):
+    """
+    Returns the same as count_solutions from up to SAMPLES random solutions,
+    an estimate only as the random search doesn't draw them uniformly.
+    """
+    counts = {}
+    cell_counts = {}
+    for _ in range(SAMPLES):
+
+        # Always draw one solution, however late, so every cell has an
+        # estimate, and no more once time is up: a draw can take fewer
+        # nodes than the search needs to look at the clock
+        if counts and time.perf_counter() > deadline:
+            break
+        search = Search(cells, constraints, deadline if counts else math.inf, rng)
+        try:
+            mine = next(search.solutions(), None)
+        except OutOfTime:
+            break
+        if mine is None:
+            break
+        k = sum(mine)
+        counts[k] = counts.get(k, 0) + 1
+        row = cell_counts.setdefault(k, [0] * len(cells))
+        for position, is_mine in enumerate(mine):
+            if is_mine:
+                row[position] += 1
+    return counts, cell_counts
+
+
+def convolve(first, second):
+    """Returns the distribution of the sum of two {mines: ways} distributions."""
+    result = {}
+    for a, ways_a in first.items():
+        for b, ways_b in second.items():
+            result[a + b] = result.get(a + b, 0) + ways_a * ways_b
+    return result
+
+
+class Guesser():
+
+    def __init__(self, rng=random):
+        self.rng = rng
+
+        # Exact results of components already counted, by their constraints
+        self.cache = {}
+
+    def component_counts(self, cells, constraints, deadline):
+        key = frozenset(constraints)
+        if key in self.cache:
+            return self.cache[key]
+
+        # Components reached after the deadline only get their one sample
+        if time.perf_counter() > deadline:
+            return sample_solutions(cells, constraints, deadline, self.rng)
+        result = count_solutions(cells, constraints, deadline)
+        if result is not None:
+            self.cache[key] = result
+            return result
+        return sample_solutions(cells, constraints, deadline, self.rng)
+
+    def probabilities(self, sentences, unknown, mines_left=None, time_budget=0.1):
+        """
+        Returns {cell: probability of being a mine} for every `unknown`
+        cell, given (cells, count) sentences over them and, if known, how
+        many mines are left among them.
+        """
+        deadline = time.perf_counter() + time_budget
+        sentences = [(frozenset(cells), count) for cells, count in sentences if cells]
+        groups = components(sentences)
+        results = [self.component_counts(cells, constraints, deadline)
+                   for cells, constraints in groups]
+        frontier = set()
+        for cells, _ in groups:
+            frontier.update(cells)
+        interior = len(unknown - frontier)
+
+        probabilities = {}
+        if mines_left is not None:
+            probabilities = self.weighted(groups, results, interior, mines_left)
+        if not probabilities:
+
+            # Without a usable mine count, every component counts on its own
+            for (cells, _), (counts, cell_counts) in zip(groups, results):
+                total = sum(counts.values())
+                for position, cell in enumerate(cells):
+                    mines = sum(row[position] for row in cell_counts.values())
+                    probabilities[cell] = mines / total if total else 0.5
+            if mines_left is not None and interior:
+                frontier_mines = sum(probabilities.values())
+                probabilities[None] = min(max((mines_left - frontier_mines) / interior, 0), 1)
+            elif probabilities:
+                probabilities[None] = sum(probabilities.values()) / len(probabilities)
+            else:
+                probabilities[None] = 0.5
+
+        interior_probability = probabilities.pop(None, 0)
+        for cell in unknown - frontier:
+            probabilities[cell] = interior_probability
+        return probabilities
+
+    def weighted(self, groups, results, interior, mines_left):
+        """
+        Returns the probabilities of the frontier cells, and of any
+        interior cell under key None, weighting the mines of each
+        component by the ways to place the rest among the interior.
+        Returns {} if no combination fits `mines_left`.
+        """
+        def ways(distribution, k):
+            """Weight of `k` frontier mines: the interior takes the others."""
+            rest = mines_left - k
+            if rest < 0 or rest > interior:
+                return 0
+            return distribution * math.comb(interior, rest)
+
+        everything = {0: 1}
+        for counts, _ in results:
+            everything = convolve(everything, counts)
+        total = sum(ways(weight, k) for k, weight in everything.items())
+        if total == 0:
+            return {}
+
+        probabilities = {}
+        for i, ((cells, _), (counts, cell_counts)) in enumerate(zip(groups, results)):
+            others = {0: 1}
+            for j, (other_counts, _) in enumerate(results):
+                if j != i:
+                    others = convolve(others, other_counts)
+            mines = [0] * len(cells)
+            for k, row in cell_counts.items():
+                weight = sum(ways(other_weight, k + j) for j, other_weight in others.items())
+                for position, count in enumerate(row):
+                    mines[position] += count * weight
+            for position, cell in enumerate(cells):
+                probabilities[cell] = mines[position] / total
+
+        if interior:
+            interior_mines = sum(
+                weight * math.comb(interior - 1, mines_left - k - 1)
+                for k, weight in everything.items()
+                if 0 < mines_left - k <= interior
+            )
+            probabilities[None] = interior_mines / total
+        return probabilities
+
+    def best_cell(self, sentences, unknown, mines_left=None, time_budget=0.1):
+        """Returns the unknown cell least likely to be a mine, or None."""
+        if not unknown:
+            return None
+        probabilities = self.probabilities(sentences, unknown, mines_left, time_budget)
+        lowest = min(probabilities.values())
+        return self.rng.choice(sorted(
+            cell for cell, probability in probabilities.items()
+            if probability <= lowest + 1e-9
+        ))
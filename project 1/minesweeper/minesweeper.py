@@ -1,5 +1,11 @@
 import itertools
 import random
+from collections import deque
+
+from guess import Guesser
+
+# Seconds a best guess may spend counting mine configurations
+GUESS_BUDGET = 0.1
 
 
 class Minesweeper():
@@ -107,7 +113,7 @@ class Sentence():
         """
         # if the number of cells is equal to the count,
         # then we can infer that all cells must be mines.
-        if self.count is len(self.cells):
+        if self.count == len(self.cells):
             return self.cells
 
         # else, we can't draw conclusions
@@ -119,7 +125,7 @@ class Sentence():
         """
         # if the count number is equals to 0,
         # then we can infer that all cells must be safe.
-        if self.count is 0:
+        if self.count == 0:
             return self.cells
 
         # else, we can't draw conclusions
@@ -148,11 +154,12 @@ class MinesweeperAI():
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8):
+    def __init__(self, height=8, width=8, mines=None):
 
-        # Set initial height and width
+        # Set initial height and width, and the number of mines if known
         self.height = height
         self.width = width
+        self.mine_count = mines
 
         # Keep track of which cells have been clicked on
         self.moves_made = set()
@@ -164,23 +171,123 @@ class MinesweeperAI():
         # List of sentences about the game known to be true
         self.knowledge = []
 
+        # The same sentences by number, the number of each distinct
+        # (cells, count) pair, and the numbers of the sentences with each cell
+        self.sentences = {}
+        self.numbers = {}
+        self.containing = {}
+        self.next_number = 0
+
+        # Numbers of the sentences to draw inferences from
+        self.worklist = deque()
+        self.queued = set()
+
+        # Probabilities for guesses, remembering components already counted
+        self.guesser = Guesser()
+
     def mark_mine(self, cell):
         """
         Marks a cell as a mine, and updates all knowledge
         to mark that cell as a mine as well.
         """
-        self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        self.record_mine(cell)
+        self.knowledge = list(self.sentences.values())
 
     def mark_safe(self, cell):
         """
         Marks a cell as safe, and updates all knowledge
         to mark that cell as safe as well.
         """
+        self.record_safe(cell)
+        self.knowledge = list(self.sentences.values())
+
+    def record_mine(self, cell):
+        """Marks a cell as a mine in the sentences with it, leaving self.knowledge stale."""
+        self.mines.add(cell)
+        for number in self.containing.pop(cell, ()):
+            self.remove_cell(number, cell, mine=True)
+
+    def record_safe(self, cell):
+        """Marks a cell as safe in the sentences with it, leaving self.knowledge stale."""
         self.safes.add(cell)
-        for sentence in self.knowledge:
+        for number in self.containing.pop(cell, ()):
+            self.remove_cell(number, cell)
+
+    def add_sentence(self, cells, count):
+        """
+        Adds a sentence to the knowledge unless it is empty or already
+        known, and queues it to draw inferences from.
+        """
+        key = (frozenset(cells), count)
+        if not cells or key in self.numbers:
+            return
+        number = self.next_number
+        self.next_number += 1
+        self.sentences[number] = Sentence(cells, count)
+        self.numbers[key] = number
+        for cell in cells:
+            self.containing.setdefault(cell, set()).add(number)
+        self.queue(number)
+
+    def remove_cell(self, number, cell, mine=False):
+        """
+        Takes a known cell out of a sentence, dropping the sentence if that
+        leaves it empty or equal to another one and queueing it otherwise.
+        """
+        sentence = self.sentences[number]
+        del self.numbers[(frozenset(sentence.cells), sentence.count)]
+        if mine:
+            sentence.mark_mine(cell)
+        else:
             sentence.mark_safe(cell)
+        key = (frozenset(sentence.cells), sentence.count)
+        if not sentence.cells or key in self.numbers:
+            del self.sentences[number]
+            for other in sentence.cells:
+                self.containing[other].discard(number)
+        else:
+            self.numbers[key] = number
+            self.queue(number)
+
+    def queue(self, number):
+        if number not in self.queued:
+            self.queued.add(number)
+            self.worklist.append(number)
+
+    def infer(self):
+        """
+        Draws inferences from queued sentences until none are left: marks
+        the cells of sentences with no mines as safe and of sentences of
+        only mines as mines, and adds the difference of every sentence and
+        its subsets among those it shares cells with.
+        """
+        while self.worklist:
+            number = self.worklist.popleft()
+            self.queued.discard(number)
+            sentence = self.sentences.get(number)
+            if sentence is None:
+                continue
+
+            if sentence.count == 0:
+                for cell in list(sentence.known_safes()):
+                    self.record_safe(cell)
+                continue
+            if sentence.count == len(sentence.cells):
+                for cell in list(sentence.known_mines()):
+                    self.record_mine(cell)
+                continue
+
+            # Only sentences sharing a cell can be subsets or supersets
+            related = set()
+            for cell in sentence.cells:
+                related |= self.containing[cell]
+            related.discard(number)
+            for other_number in related:
+                other = self.sentences[other_number]
+                if other.cells < sentence.cells:
+                    self.add_sentence(sentence.cells - other.cells, sentence.count - other.count)
+                elif sentence.cells < other.cells:
+                    self.add_sentence(other.cells - sentence.cells, other.count - sentence.count)
 
     def obtain_neighbors(self, cell):
         """
@@ -213,46 +320,19 @@ class MinesweeperAI():
         """
         # Mark the cell as a move and as a safe
         self.moves_made.add(cell)
-        self.mark_safe(cell=cell)
-
-        new_sentence = Sentence(cells=self.obtain_neighbors(cell), count=count)
-
-        for mine in self.mines:
-            new_sentence.mark_mine(mine)
-        for safe in self.safes:
-            new_sentence.mark_safe(safe)
-
-        # Add new sentence to the knowledge, based in cell and its neghbors
-        self.knowledge.append(new_sentence)
-
-        # Mark others cells as safes or as mines, based in any sentence on knowledge
-        new_safes = set()
-        new_mines = set()
-
-        for sentence in self.knowledge:
-            for cell in sentence.known_mines():
-                new_mines.add(cell)
-            for cell in sentence.known_safes():
-                new_safes.add(cell)
-        for cell in new_safes:
-            self.mark_safe(cell)
-
-        for cell in new_mines:
-            self.mark_mine(cell)
-
-        # Apply the subset rule in knowledge
-        new_sentences = []
-        for set1 in self.knowledge:
-            for set2 in self.knowledge:
-                if set1 != set2 and set2.cells.issubset(set1.cells):
-                    new_sentence = Sentence(
-                        cells=set1.cells - set2.cells,
-                        count=set1.count - set2.count
-                    )
-                    if new_sentence not in self.knowledge and new_sentence not in new_sentences:
-                        new_sentences.append(new_sentence)
-
-        self.knowledge.extend(new_sentences)
+        self.record_safe(cell)
+
+        # Add new sentence to the knowledge, based in cell and its neighbors
+        # that aren't known yet
+        neighbors = self.obtain_neighbors(cell)
+        self.add_sentence(
+            neighbors - self.safes - self.mines, count - len(neighbors & self.mines)
+        )
+
+        # Mark cells as safes or as mines, and apply the subset rule, starting
+        # from the sentences that changed and until nothing more follows
+        self.infer()
+        self.knowledge = list(self.sentences.values())
 
     def make_safe_move(self):
         """
@@ -295,3 +375,25 @@ class MinesweeperAI():
 
         # Else, return a random possible move
         return random.choice(list(moves))
+
+    def make_guess_move(self, time_budget=GUESS_BUDGET):
+        """
+        Returns the cell least likely to be a mine among those that have
+        not been chosen and are not known to be mines, or None.
+
+        The probabilities come from every mine configuration consistent
+        with the knowledge and, if it was given, the number of mines,
+        taking at most about `time_budget` seconds to count them.
+        """
+        unknown = set()
+        for i in range(self.height):
+            for j in range(self.width):
+                move = (i, j)
+                if move not in self.moves_made and move not in self.mines:
+                    unknown.add(move)
+
+        mines_left = None
+        if self.mine_count is not None:
+            mines_left = self.mine_count - len(self.mines)
+        sentences = [(sentence.cells, sentence.count) for sentence in self.sentences.values()]
+        return self.guesser.best_cell(sentences, unknown, mines_left, time_budget)
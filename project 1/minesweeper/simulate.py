@@ -0,0 +1,148 @@
+"""
+Plays many seeded Minesweeper games with the AI, without a window, and
+reports for every board size its win rate, moves per second of the AI's
+time and percentiles of the seconds each move takes: choosing the move and
+adding what it reveals to the knowledge.
+
+Games are spread over a pool of worker processes. Game i of every board
+uses seed + i, so runs with the same arguments play the same games.
+Results are written as JSON or CSV with one record per board.
+
+Usage: python simulate.py [--boards HxWxM ...] [--games N] [--seed S] [--workers N]
+       [--strategy guess|random] [--budget SECONDS] [--format json|csv] [--output FILE]
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import random
+import sys
+import time
+
+from minesweeper import GUESS_BUDGET, Minesweeper, MinesweeperAI
+
+FIELDS = ["height", "width", "mines", "strategy", "games", "wins", "win_rate", "moves",
+          "seconds", "moves_per_second", "p50_ms", "p90_ms", "p99_ms", "max_ms"]
+
+
+def board(text):
+    """Parses a board size written as HEIGHTxWIDTHxMINES."""
+    try:
+        height, width, mines = (int(part) for part in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{text}' is not HEIGHTxWIDTHxMINES")
+    if height < 1 or width < 1 or not 0 <= mines < height * width:
+        raise argparse.ArgumentTypeError(f"no {height}x{width} board has {mines} mines")
+    return height, width, mines
+
+
+def play_game(task):
+    """
+    Plays one (height, width, mines, seed, strategy, budget) game, returning
+    (task, won, seconds of each move).
+    """
+    height, width, mines, seed, strategy, budget = task
+    random.seed(seed)
+    game = Minesweeper(height=height, width=width, mines=mines)
+    ai = MinesweeperAI(height=height, width=width, mines=mines)
+    latencies = []
+    while len(ai.moves_made) < height * width - mines:
+        start = time.perf_counter()
+        move = ai.make_safe_move()
+        if move is None and strategy == "guess":
+            move = ai.make_guess_move(budget)
+        elif move is None:
+            move = ai.make_random_move()
+        if move is None or game.is_mine(move):
+            return task, False, latencies
+        ai.add_knowledge(move, game.nearby_mines(move))
+        latencies.append(time.perf_counter() - start)
+    return task, True, latencies
+
+
+def percentile(ordered, fraction):
+    """Returns the value of a sorted list below which `fraction` of it falls."""
+    if not ordered:
+        return 0.0
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def simulate(boards, games, seed=0, workers=1, strategy="guess", budget=GUESS_BUDGET):
+    """Plays `games` games on each (height, width, mines) board, returning one record per board."""
+    boards = list(dict.fromkeys(boards))
+    tasks = [
+        (height, width, mines, seed + game, strategy, budget)
+        for height, width, mines in boards
+        for game in range(games)
+    ]
+
+    # Results of every board, as [wins, latencies]
+    results = {size: [0, []] for size in boards}
+    if workers > 1:
+        chunksize = max(1, len(tasks) // (workers * 8))
+        with multiprocessing.Pool(workers) as pool:
+            played = pool.imap_unordered(play_game, tasks, chunksize)
+            for task, won, latencies in played:
+                results[task[:3]][0] += won
+                results[task[:3]][1].extend(latencies)
+    else:
+        for task, won, latencies in map(play_game, tasks):
+            results[task[:3]][0] += won
+            results[task[:3]][1].extend(latencies)
+
+    records = []
+    for (height, width, mines), (wins, latencies) in results.items():
+        latencies.sort()
+        seconds = sum(latencies)
+        records.append({
+            "height": height,
+            "width": width,
+            "mines": mines,
+            "strategy": strategy,
+            "games": games,
+            "wins": wins,
+            "win_rate": wins / games if games else 0.0,
+            "moves": len(latencies),
+            "seconds": seconds,
+            "moves_per_second": len(latencies) / seconds if seconds else 0.0,
+            "p50_ms": percentile(latencies, 0.5) * 1000,
+            "p90_ms": percentile(latencies, 0.9) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+            "max_ms": percentile(latencies, 1) * 1000
+        })
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--boards", type=board, nargs="+",
+                        default=[(8, 8, 8), (9, 9, 10), (16, 16, 40), (16, 30, 99)],
+                        help="board sizes, as HEIGHTxWIDTHxMINES")
+    parser.add_argument("--games", type=int, default=1000,
+                        help="games played on each board")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(),
+                        help="number of worker processes")
+    parser.add_argument("--strategy", choices=["guess", "random"], default="guess",
+                        help="how to move when no cell is known to be safe")
+    parser.add_argument("--budget", type=float, default=GUESS_BUDGET,
+                        help="seconds a best guess may take")
+    parser.add_argument("--format", dest="form", choices=["json", "csv"], default="json")
+    parser.add_argument("--output", type=argparse.FileType("w", encoding="utf-8"),
+                        default=sys.stdout)
+    args = parser.parse_args()
+
+    records = simulate(args.boards, args.games, args.seed, args.workers, args.strategy,
+                       args.budget)
+    if args.form == "csv":
+        writer = csv.DictWriter(args.output, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(records)
+    else:
+        json.dump(records, args.output, indent=2)
+        args.output.write("\n")
+
+
+if __name__ == "__main__":
+    main()